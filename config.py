@@ -13,6 +13,9 @@ APP_AUTHOR = "CZ Team"
 DEFAULT_QUALITY = "best"
 DEFAULT_DOWNLOAD_PATH = str(Path.home() / "Downloads" / "czDownloader")
 
+# App data (caches, persistent state)
+APP_DATA_DIR = str(Path.home() / ".czdownloader")
+
 # Supported Platforms
 SUPPORTED_PLATFORMS = {
     'youtube.com': 'YouTube',
@@ -39,10 +42,65 @@ QUALITY_OPTIONS = [
 SUPPORTED_FORMATS = ['mp4', 'mkv', 'webm', 'avi', 'flv']
 
 # Download Settings
-MAX_CONCURRENT_DOWNLOADS = 3
+MAX_CONCURRENT_DOWNLOADS = 8  # upper bound for auto concurrency
+AUTO_CONCURRENCY_INTERVAL = 10  # seconds per throughput measurement window
 TIMEOUT_SECONDS = 60
 RETRY_ATTEMPTS = 3
 
+# Segmented Downloads (parallel byte ranges, unless the aria2c daemon is used)
+SEGMENTED_CONNECTIONS = 8  # connections per file, 1 = single stream
+SEGMENTED_MIN_SIZE = 10 * 1024 * 1024  # smaller files use one connection
+SEGMENT_SIZE = 4 * 1024 * 1024
+FRAGMENT_CONNECTIONS = 32  # HLS/DASH fragments in flight, shared by all downloads
+
+# aria2c Daemon (one long-lived aria2c driven over JSON-RPC, when enabled)
+ARIA2_RPC_PORT = 16800
+ARIA2_POLL_INTERVAL = 0.5  # seconds between batched status polls
+
+# Persistent Queue (GUI queue survives crashes/restarts)
+QUEUE_DB_FILE = os.path.join(APP_DATA_DIR, "queue.db")
+
+# Download Archive (completed videos are skipped when queued again)
+DOWNLOAD_ARCHIVE_FILE = os.path.join(APP_DATA_DIR, "archive.db")
+
+# Subscriptions (channels/playlists synced incrementally from a stored cursor)
+SUBSCRIPTIONS_FILE = os.path.join(APP_DATA_DIR, "subscriptions.db")
+SUBSCRIPTION_STOP_AFTER = 3  # known entries in a row that end a sync
+
+# Error Log (czdownloader_errors.log + czdownloader_events.jsonl in the download folder)
+LOG_MAX_MB = 5  # rotate when a log file grows past this
+LOG_ROTATE_DAYS = 7  # ...or gets older than this
+LOG_BACKUP_COUNT = 5  # gzipped rotations kept per log
+
+# Metadata Analysis (global cap + per-platform caps, keyed by SUPPORTED_PLATFORMS names)
+ANALYSIS_CONCURRENCY = 6
+ANALYSIS_PLATFORM_LIMIT = 2  # platforms not listed below
+ANALYSIS_PLATFORM_LIMITS = {
+    'YouTube': 3,
+    'Facebook': 2,
+    'TikTok': 1,
+    'Instagram': 1,
+    'Twitter/X': 2
+}
+
+# Download Politeness (per platform, names from SUPPORTED_PLATFORMS; unlisted = no extra limit)
+DOWNLOAD_PLATFORM_LIMITS = {  # max downloads running at once
+    'TikTok': 2,
+    'Instagram': 2,
+    'Facebook': 3,
+    'Twitter/X': 3
+}
+DOWNLOAD_PLATFORM_INTERVALS = {  # min seconds between download starts
+    'TikTok': 2.0,
+    'Instagram': 3.0
+}
+
+# Metadata Cache (skip re-analysis of recently seen URLs)
+METADATA_CACHE_FILE = os.path.join(APP_DATA_DIR, "metadata_cache.db")
+METADATA_CACHE_TTL = 7 * 24 * 3600  # seconds
+METADATA_CACHE_MAX_MB = 50
+INFO_REUSE_TTL = 20 * 60  # seconds an analyzed info dict is reused when media URLs carry no expiry
+
 # UI Settings
 WINDOW_WIDTH = 700
 WINDOW_HEIGHT = 500
@@ -0,0 +1,20 @@
+"""
+engine package - headless download engine (no tkinter dependency)
+"""
+from .models import VideoItem
+from .logger import ErrorLogger
+from .cache import MetadataCache
+from .archive import DownloadArchive, FileIndex, archive_key, archive_key_for_url
+from .urls import normalize_url, canonical_url, dedupe_key, is_playlist_url, platform_of
+from .persistence import QueueDatabase
+from .store import QueueStore, ACTIVE_STATUSES
+from .bandwidth import BandwidthLimiter, ReceivedCounter
+from .fragments import FragmentBudget
+from .autotune import ConcurrencyController
+from .segmented import SegmentedFD, SegmentedYoutubeDL
+from .aria2 import Aria2Daemon, Aria2Error, Aria2RPCFD, Aria2YoutubeDL
+from .workers import DownloadExecutor, KeyedExecutor
+from .batches import Batch, TERMINAL_STATUSES
+from .playlists import PlaylistExpansion
+from .subscriptions import SubscriptionStore
+from .core import DownloadEngine, DownloadInterrupted, CustomFilenameHook, YTDLP_AVAILABLE
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless runner for the download engine (no display required)
+
+Usage:
+    python -m engine URL [URL ...] [-o FOLDER] [-q QUALITY] [-c N] [-r MBPS] [--audio-only] [--aria2-rpc]
+    python -m engine --subscribe CHANNEL_OR_PLAYLIST_URL [...]
+    python -m engine --sync
+"""
+
+import argparse
+import sys
+
+from .core import DownloadEngine
+from .urls import is_playlist_url
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine",
+                                     description="CZ Video Downloader - headless mode")
+    parser.add_argument('urls', nargs='*', help="Video or playlist URLs")
+    parser.add_argument('-i', '--input', help="File with one URL per line")
+    parser.add_argument('-o', '--output', help="Download folder")
+    parser.add_argument('-q', '--quality', default="best",
+                        choices=["best", "1080p", "720p", "480p", "360p", "worst"])
+    parser.add_argument('-c', '--concurrent', type=int, default=2, help="Max concurrent downloads")
+    parser.add_argument('-r', '--limit-rate', type=float, default=0,
+                        help="Total bandwidth limit in MB/s shared by all downloads (0 = unlimited)")
+    parser.add_argument('--audio-only', action='store_true', help="Extract audio only (MP3)")
+    parser.add_argument('--aria2-rpc', action='store_true',
+                        help="Send downloads to one long-lived aria2c daemon (needs aria2c)")
+    parser.add_argument('--subscribe', action='store_true',
+                        help="Save the given channel/playlist URLs as subscriptions and sync them")
+    parser.add_argument('--sync', action='store_true',
+                        help="Download what is new in every subscribed channel/playlist")
+    parser.add_argument('--template', default="%(title)s.%(ext)s", help="Filename template")
+    args = parser.parse_args(argv)
+
+    urls = list(args.urls)
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            urls.extend(line.strip() for line in f if line.strip())
+    if not urls and not args.sync:
+        parser.error("no URLs given")
+
+    engine = DownloadEngine(args.output)
+    engine.configure(default_quality=args.quality,
+                     max_concurrent=args.concurrent,
+                     audio_only=args.audio_only,
+                     filename_template=args.template,
+                     aria2_rpc=args.aria2_rpc,
+                     bandwidth_limit=int(args.limit_rate * 1024 * 1024))
+
+    def on_event(event, video_item, changes):
+        if event == 'expansion' and changes['done']:
+            print(f"📃 {changes['added']} videos from {changes['url']}"
+                  + (f" ({changes['error']})" if changes['error'] else ""))
+        elif event == 'updated' and 'status' in changes:
+            print(f"[{changes['status']:>11}] {video_item.title} ({video_item.url})")
+            if changes['status'] == 'error':
+                print(f"              ❌ {video_item.error_message}")
+
+    engine.subscribe(on_event)
+
+    # Subscriptions only list entries newer than their last sync
+    syncs = []
+    if args.subscribe:
+        for url in urls:
+            engine.add_subscription(url, args.quality)
+        syncs = engine.sync_subscriptions(urls=set(urls), start=True)
+        urls = []
+    elif args.sync:
+        syncs = engine.sync_subscriptions(start=True)
+
+    # Analyze single videos synchronously so the batch sees them as pending
+    playlists = []
+    for url in urls:
+        if not engine.validate_url(url):
+            print(f"🚫 URL not supported: {url}")
+            continue
+        if is_playlist_url(url):
+            playlists.append(url)
+            continue
+        video_item = engine.add_video(url, analyze=False)
+        if video_item is None:
+            print(f"⏭️ Already queued: {url}")
+        elif video_item.status == "pending":
+            engine.analyze_video(video_item)
+
+    batches = [batch for batch in [engine.start_batch()] if batch]
+
+    # Playlists download while their later pages are still being fetched
+    expansions = syncs + [engine.expand_in_background(url, start=True) for url in playlists]
+    for expansion in expansions:
+        expansion.future.result()
+        if expansion.batch:
+            batches.append(expansion.batch)
+
+    results = [batch.future.result() for batch in batches]
+    engine.close()
+    if not any(result['total'] for result in results):
+        print("No videos to download!")
+        return 0 if syncs else 1  # nothing new in the subscriptions is fine
+
+    completed = sum(result['completed'] for result in results)
+    total = sum(result['total'] for result in results)
+    failed = sum(result['failed'] for result in results)
+    print(f"\n✅ Completed: {completed} / {total} • ❌ Failed: {failed}")
+    return 0 if not failed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
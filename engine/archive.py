@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Download archive - completed videos keyed by extractor and video id
+(yt-dlp's archive id format), plus an index of the files already in the
+download folder, so finished videos are skipped without a network call
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+try:
+    from yt_dlp.extractor import gen_extractor_classes
+except ImportError:
+    gen_extractor_classes = None
+
+
+def archive_key(extractor_key, video_id):
+    """Archive id as yt-dlp writes it ('youtube dQw4w9WgXcQ')"""
+    return f"{extractor_key.lower()} {video_id}"
+
+
+_extractors = None
+_host_extractors = {}  # host -> extractor class that matched last time
+
+
+def archive_key_for_url(url):
+    """Archive id derived from the URL alone (no network), or None if
+    no extractor can tell the video id from the URL"""
+    global _extractors
+    if gen_extractor_classes is None:
+        return None
+    if _extractors is None:
+        _extractors = [ie for ie in gen_extractor_classes() if ie.ie_key() != 'Generic']
+
+    host = (urlparse(url).hostname or '').lower()
+    cached = _host_extractors.get(host)
+    candidates = ([cached] if cached else []) + _extractors
+    for ie in candidates:
+        if ie.suitable(url):
+            _host_extractors[host] = ie
+            video_id = ie.get_temp_id(url)
+            return archive_key(ie.ie_key(), video_id) if video_id else None
+    return None
+
+
+class DownloadArchive:
+    """Persistent set of completed downloads.
+
+    All keys are loaded into memory when opened, so lookups are O(1) and
+    never touch the disk; additions are committed right away (SQLite, WAL).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS archive (
+                key TEXT PRIMARY KEY,
+                title TEXT,
+                filename TEXT,
+                completed_at TEXT NOT NULL
+            )""")
+        self._db.commit()
+        self._entries = {key: (title, filename) for key, title, filename
+                         in self._db.execute("SELECT key, title, filename FROM archive")}
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """(title, filename) of an archived download, or None"""
+        return self._entries.get(key)
+
+    def add(self, key, title='', filename=''):
+        """Record a completed download"""
+        with self._lock:
+            self._entries[key] = (title, filename)
+            self._db.execute("INSERT OR REPLACE INTO archive VALUES (?, ?, ?, ?)",
+                             (key, title, filename, datetime.now().isoformat()))
+            self._db.commit()
+
+    def remove(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._db.execute("DELETE FROM archive WHERE key = ?", (key,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class FileIndex:
+    """Case-insensitive set of the file names in a folder.
+
+    Built with a single directory scan the first time it is needed (and
+    again when the folder changes); downloads add their files as they
+    finish.
+    """
+
+    def __init__(self, folder):
+        self._lock = threading.Lock()
+        self._folder = folder
+        self._names = None
+
+    def set_folder(self, folder):
+        with self._lock:
+            if folder != self._folder:
+                self._folder = folder
+                self._names = None
+
+    def _scan(self):
+        """File names in the folder (caller holds _lock)"""
+        if self._names is None:
+            try:
+                with os.scandir(self._folder) as entries:
+                    self._names = {entry.name.lower() for entry in entries if entry.is_file()}
+            except OSError:
+                self._names = set()
+        return self._names
+
+    def __contains__(self, name):
+        with self._lock:
+            if name.lower() not in self._scan():
+                return False
+        # Still there? (may have been deleted since the scan)
+        return os.path.exists(os.path.join(self._folder, name))
+
+    def add(self, name):
+        with self._lock:
+            self._scan().add(name.lower())
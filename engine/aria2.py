@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent aria2c daemon - one long-lived aria2c process driven over
+JSON-RPC instead of a new process per file
+"""
+
+import itertools
+import json
+import os
+import secrets
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+
+try:
+    import yt_dlp
+    from yt_dlp.downloader.common import FileDownloader
+except ImportError:
+    yt_dlp = None
+    FileDownloader = object
+
+from .segmented import SegmentedFD
+
+STATUS_KEYS = ['gid', 'status', 'totalLength', 'completedLength', 'downloadSpeed',
+               'errorCode', 'errorMessage']
+
+
+class Aria2Error(Exception):
+    """aria2c returned a JSON-RPC error or could not be reached"""
+
+
+class Aria2Daemon:
+    """A single aria2c process shared by every download.
+
+    Transfers are submitted with add() and watched by one poller thread
+    that fetches the status of all of them in a single system.multicall
+    per interval. Global options (overall bandwidth limit, connections
+    per file, concurrent downloads) are re-applied with set_options()
+    whenever the engine settings change.
+    """
+
+    def __init__(self, executable='aria2c', port=16800, poll_interval=0.5, options=None):
+        self.executable = executable
+        self.port = port
+        self.poll_interval = poll_interval
+        self.options = dict(options or {})
+        self.secret = secrets.token_hex(16)
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._process = None
+        self._poller = None
+        self._watched = set()
+        self._status = {}  # gid -> last tellStatus result
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.port}/jsonrpc'
+
+    @property
+    def running(self):
+        return self._process is not None and self._process.poll() is None
+
+    def start(self, timeout=5.0):
+        """Launch aria2c (once) and wait until its RPC interface answers"""
+        with self._lock:
+            if self.running:
+                return
+            args = [self.executable, '--enable-rpc', '--rpc-listen-all=false',
+                    f'--rpc-listen-port={self.port}', f'--rpc-secret={self.secret}',
+                    '--min-split-size=1M', '--continue=true', '--allow-overwrite=true',
+                    '--auto-file-renaming=false', '--console-log-level=warn', '--quiet=true']
+            args += [f'--{key}={value}' for key, value in self.options.items()]
+            self._process = subprocess.Popen(args, stdin=subprocess.DEVNULL,
+                                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                             creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    self.call('aria2.getVersion')
+                    break
+                except Aria2Error:
+                    if not self.running or time.monotonic() > deadline:
+                        self._kill()
+                        raise Aria2Error("aria2c RPC did not start")
+                    time.sleep(0.1)
+
+            self._poller = threading.Thread(target=self._poll_loop, name="aria2-poller", daemon=True)
+            self._poller.start()
+
+    def stop(self):
+        """Shut aria2c down; unfinished transfers keep their control files"""
+        with self._lock:
+            if not self.running:
+                return
+            try:
+                self.call('aria2.shutdown')
+                self._process.wait(timeout=5)
+            except (Aria2Error, subprocess.TimeoutExpired):
+                self._kill()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _kill(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+
+    def _post(self, payload):
+        request = urllib.request.Request(self.url, data=json.dumps(payload).encode('utf-8'),
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                reply = json.load(response)
+        except urllib.error.HTTPError as e:
+            try:
+                reply = json.load(e)
+            except ValueError:
+                raise Aria2Error(f"aria2c RPC HTTP {e.code}") from e
+        except (OSError, ValueError) as e:
+            raise Aria2Error(f"aria2c RPC unreachable: {e}") from e
+        if 'error' in reply:
+            raise Aria2Error(reply['error'].get('message', 'unknown error'))
+        return reply['result']
+
+    def call(self, method, *params):
+        """Run one JSON-RPC method and return its result"""
+        return self._post({'jsonrpc': '2.0', 'id': next(self._ids), 'method': method,
+                           'params': [f'token:{self.secret}', *params]})
+
+    def multicall(self, calls):
+        """Run [(method, params), ...] in one request; failed calls yield None"""
+        results = self.call('system.multicall', [
+            {'methodName': method, 'params': [f'token:{self.secret}', *params]}
+            for method, params in calls])
+        return [result[0] if isinstance(result, list) else None for result in results]
+
+    def set_options(self, options):
+        """Update global options now (if running) and for future starts"""
+        options = {key: str(value) for key, value in options.items()}
+        if options == {key: self.options.get(key) for key in options}:
+            return
+        self.options.update(options)
+        if self.running:
+            try:
+                self.call('aria2.changeGlobalOption', options)
+            except Aria2Error as e:
+                print(f"⚠️ aria2c options not applied: {e}")
+
+    def add(self, url, path, headers=None):
+        """Start a transfer of url into path; returns its gid"""
+        options = {
+            'dir': os.path.dirname(os.path.abspath(path)),
+            'out': os.path.basename(path),
+            'header': [f'{key}: {value}' for key, value in (headers or {}).items()],
+        }
+        gid = self.call('aria2.addUri', [url], options)
+        with self._cond:
+            self._watched.add(gid)
+        return gid
+
+    def wait(self, gid, timeout=None):
+        """Block until the next status poll; returns the gid's latest status"""
+        with self._cond:
+            self._cond.wait(timeout if timeout is not None else self.poll_interval * 4)
+            return self._status.get(gid)
+
+    def remove(self, gid):
+        """Stop a transfer (the partial file stays for resume) and forget it"""
+        try:
+            self.call('aria2.forceRemove', gid)
+            # forceRemove is asynchronous; wait until aria2c has released the file
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if self.call('aria2.tellStatus', gid, ['status'])['status'] == 'removed':
+                    break
+                time.sleep(0.1)
+        except Aria2Error:
+            pass  # already finished or failed
+        self.forget(gid)
+
+    def forget(self, gid):
+        """Stop watching a gid and drop its result from aria2c"""
+        with self._cond:
+            self._watched.discard(gid)
+            self._status.pop(gid, None)
+        try:
+            self.call('aria2.removeDownloadResult', gid)
+        except Aria2Error:
+            pass
+
+    def _poll_loop(self):
+        while self.running:
+            with self._cond:
+                gids = list(self._watched)
+            if gids:
+                try:
+                    results = self.multicall([('aria2.tellStatus', [gid, STATUS_KEYS]) for gid in gids])
+                except Aria2Error:
+                    results = []
+                with self._cond:
+                    for gid, status in zip(gids, results):
+                        if status is not None and gid in self._watched:
+                            self._status[gid] = status
+                    self._cond.notify_all()
+            time.sleep(self.poll_interval)
+
+
+class Aria2RPCFD(FileDownloader):
+    """yt-dlp file downloader that hands the transfer to an Aria2Daemon.
+
+    Progress from the daemon's status polls goes through the normal
+    progress hooks (with the aria2 'gid' added); if a hook raises
+    (pause/cancel) the transfer is removed from aria2c and its .part and
+    .aria2 control files are left for resume.
+    """
+
+    def __init__(self, ydl, params, daemon):
+        super().__init__(ydl, params)
+        self.daemon = daemon
+
+    def real_download(self, filename, info_dict):
+        tmpfilename = self.temp_name(filename)
+        self.report_destination(filename)
+        gid = self.daemon.add(info_dict['url'], tmpfilename, info_dict.get('http_headers'))
+        start_time = time.time()
+
+        try:
+            while True:
+                status = self.daemon.wait(gid)
+                if not self.daemon.running:
+                    raise yt_dlp.utils.DownloadError("aria2c daemon stopped")
+                if status is None:
+                    continue
+
+                state = status.get('status')
+                total = int(status.get('totalLength') or 0)
+                downloaded = int(status.get('completedLength') or 0)
+                if state == 'complete':
+                    break
+                if state in ('error', 'removed'):
+                    raise yt_dlp.utils.DownloadError(
+                        f"aria2c error {status.get('errorCode')}: {status.get('errorMessage') or state}")
+
+                speed = int(status.get('downloadSpeed') or 0)
+                self._hook_progress({
+                    'status': 'downloading',
+                    'downloaded_bytes': downloaded,
+                    'total_bytes': total or None,
+                    'tmpfilename': tmpfilename,
+                    'filename': filename,
+                    'elapsed': time.time() - start_time,
+                    'speed': speed,
+                    'eta': self.calc_eta(speed, total - downloaded) if speed and total else None,
+                    'gid': gid,
+                }, info_dict)
+        except BaseException:
+            self.daemon.remove(gid)
+            raise
+
+        self.daemon.forget(gid)
+        self.try_rename(tmpfilename, filename)
+        self._hook_progress({
+            'status': 'finished',
+            'downloaded_bytes': total,
+            'total_bytes': total,
+            'filename': filename,
+            'elapsed': time.time() - start_time,
+            'gid': gid,
+        }, info_dict)
+        return True
+
+
+class Aria2YoutubeDL(yt_dlp.YoutubeDL if yt_dlp else object):
+    """YoutubeDL that sends progressive HTTP(S) files to a shared aria2c daemon"""
+
+    def __init__(self, params=None, daemon=None):
+        super().__init__(params)
+        self.daemon = daemon
+
+    def dl(self, name, info, subtitle=False, test=False):
+        if test or subtitle or name == '-' or not SegmentedFD.supports(info):
+            return super().dl(name, info, subtitle, test)
+
+        new_info = self._copy_infodict(info)
+        if new_info.get('http_headers') is None:
+            new_info['http_headers'] = self._calc_headers(new_info)
+        fd = Aria2RPCFD(self, self.params, self.daemon)
+        for ph in self._progress_hooks:
+            fd.add_progress_hook(ph)
+        self.write_debug(f'Submitting "{info["url"]}" to the aria2c daemon')
+        return fd.download(name, new_info, subtitle)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Adaptive concurrency - hill-climb the number of active downloads towards
+the highest aggregate throughput, backing off on 429/503 responses
+"""
+
+import threading
+import time
+
+
+class ConcurrencyController:
+    """Periodically retunes the download pool size.
+
+    Every `interval` seconds the aggregate throughput is compared with
+    the previous window: while adding downloads keeps paying off (>5%
+    faster) it keeps climbing, otherwise it steps back and holds for a
+    few windows. Any throttling response (429/503) halves the level.
+    """
+
+    GAIN = 1.05  # minimum relative improvement worth another download
+    HOLD_TICKS = 3  # windows to stay put after a reversal or back-off
+
+    def __init__(self, apply, demand, minimum=1, maximum=8, interval=10.0):
+        self.apply = apply  # apply(level) resizes the pool
+        self.demand = demand  # demand() -> downloads that could run right now
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = interval
+        self.level = minimum
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._throttled = 0
+        self._last_rate = None
+        self._direction = 1
+        self._hold = 0
+        self._window_start = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, level):
+        """Start tuning from level"""
+        if self._thread:
+            return
+        self.level = max(self.minimum, min(self.maximum, level))
+        self._last_rate = None
+        self._hold = 0
+        self._window_start = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="concurrency-tuner")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def record_bytes(self, nbytes):
+        """Bytes received by any download"""
+        with self._lock:
+            self._bytes += nbytes
+
+    def record_throttle(self):
+        """A download hit 429/503"""
+        with self._lock:
+            self._throttled += 1
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"⚠️ Concurrency tuner error: {e}")
+
+    def tick(self):
+        """Evaluate the last window and pick the next level"""
+        with self._lock:
+            now = time.monotonic()
+            rate = self._bytes / max(1e-6, now - self._window_start)
+            throttled = self._throttled
+            self._bytes = 0
+            self._throttled = 0
+            self._window_start = now
+
+        level = self.level
+        if throttled:
+            # Server pushes back - cut hard, then wait before probing again
+            level = max(self.minimum, level // 2)
+            self._direction = 1
+            self._hold = self.HOLD_TICKS
+        elif self._hold:
+            self._hold -= 1
+        elif self.demand() < level:
+            pass  # not enough queued work to measure this level
+        elif self._last_rate is None or rate > self._last_rate * self.GAIN:
+            level += self._direction  # still paying off - keep going
+        else:
+            # No gain - step back and settle for a while
+            self._direction = -self._direction
+            level += self._direction
+            self._hold = self.HOLD_TICKS
+
+        level = max(self.minimum, min(self.maximum, level))
+        self._last_rate = rate
+
+        if level != self.level:
+            self.level = level
+            self.apply(level)
+        return level
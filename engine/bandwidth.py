@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Global bandwidth limit - one token bucket shared by every active download
+"""
+
+import threading
+import time
+
+
+class BandwidthLimiter:
+    """Token bucket (bytes/s) shared across downloads.
+
+    Downloads report received bytes through consume() and sleep off any
+    deficit, so whatever budget one download doesn't use (finished,
+    stalled, slow server) is automatically available to the others.
+    A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate=0, burst_seconds=1.0):
+        self.burst_seconds = burst_seconds
+        self._lock = threading.Lock()
+        self._rate = 0
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self.set_rate(rate)
+
+    @property
+    def rate(self):
+        return self._rate
+
+    def set_rate(self, rate):
+        """Change the limit (bytes/s, 0 = unlimited); applies immediately"""
+        with self._lock:
+            self._rate = max(0, int(rate or 0))
+            self._tokens = min(self._tokens, self._rate * self.burst_seconds)
+            self._updated = time.monotonic()
+
+    def consume(self, nbytes, wait=True):
+        """Take nbytes from the bucket; with wait, sleep until they are covered"""
+        with self._lock:
+            if not self._rate or nbytes <= 0:
+                return 0.0
+            now = time.monotonic()
+            burst = self._rate * self.burst_seconds
+            self._tokens = min(burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= nbytes
+            delay = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait and delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class ReceivedCounter:
+    """New bytes per progress tick of one download, from the cumulative
+    downloaded_bytes its hooks report.
+
+    The first tick of each file only sets the baseline: a resumed download
+    (.part file, saved segments, aria2 completedLength) starts with what is
+    already on disk, which is not traffic and must not be charged.
+    """
+
+    def __init__(self):
+        self.last = None
+
+    def reset(self):
+        """The next file (e.g. audio after video) starts a new baseline"""
+        self.last = None
+
+    def delta(self, downloaded):
+        last, self.last = self.last, downloaded
+        if last is None:
+            return 0
+        return max(0, downloaded - last)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Download batches - count outstanding items and complete the moment the
+last one reaches a terminal state (no polling)
+"""
+
+import itertools
+from concurrent.futures import Future
+from datetime import datetime
+
+# Statuses that end an item's part in a batch
+TERMINAL_STATUSES = ('completed', 'error', 'cancelled')
+
+_batch_ids = itertools.count(1)
+
+
+class Batch:
+    """A set of videos started together, with its own summary.
+
+    `future` resolves to summary() when every item is terminal;
+    `on_complete` callbacks receive the same summary. A held batch
+    (e.g. fed by a playlist expansion) can still grow with add() and
+    does not complete before release().
+    """
+
+    def __init__(self, video_items, on_complete=None):
+        self.id = next(_batch_ids)
+        self.video_ids = {v.id for v in video_items}
+        self.start_time = datetime.now()
+        self.end_time = None
+        self.finished = {}  # video_id -> terminal status
+        self.errors = []
+        self.future = Future()
+        self.callbacks = [on_complete] if on_complete else []
+        self.held = False
+
+    @property
+    def total(self):
+        return len(self.video_ids)
+
+    @property
+    def outstanding(self):
+        return self.total - len(self.finished)
+
+    @property
+    def done(self):
+        return self.end_time is not None
+
+    def add_done_callback(self, callback):
+        """Register callback(summary); called immediately if already done"""
+        if self.done:
+            callback(self.summary())
+        else:
+            self.callbacks.append(callback)
+
+    def add(self, video_items):
+        """Include more items in a running batch"""
+        self.video_ids.update(v.id for v in video_items)
+
+    def release(self):
+        """Stop holding the batch. Returns True if that completes it."""
+        self.held = False
+        if not self.done and self.outstanding == 0:
+            self.end_time = datetime.now()
+            return True
+        return False
+
+    def item_changed(self, video_item, status):
+        """Record a status change. Returns True when this completes the batch."""
+        if self.done or video_item.id not in self.video_ids:
+            return False
+
+        if status in TERMINAL_STATUSES:
+            if video_item.id in self.finished:
+                return False
+            self.finished[video_item.id] = status
+            if status == 'error':
+                self.errors.append({
+                    'id': video_item.id,
+                    'title': video_item.title,
+                    'url': video_item.url[:50] + "...",
+                    'error': video_item.error_message
+                })
+        elif video_item.id in self.finished:
+            # Item was retried while the batch is still running
+            if self.finished.pop(video_item.id) == 'error':
+                self.errors = [e for e in self.errors if e['id'] != video_item.id]
+            return False
+
+        if self.outstanding == 0 and not self.held:
+            self.end_time = datetime.now()
+            return True
+        return False
+
+    def summary(self):
+        """Batch summary dict (total, completed, failed, cancelled, errors, times)"""
+        statuses = list(self.finished.values())
+        return {
+            'batch_id': self.id,
+            'total': self.total,
+            'completed': statuses.count('completed'),
+            'failed': statuses.count('error'),
+            'cancelled': statuses.count('cancelled'),
+            'outstanding': self.outstanding,
+            'errors': list(self.errors),
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+        }
+
+    def complete(self):
+        """Resolve the future and run completion callbacks"""
+        summary = self.summary()
+        for callback in self.callbacks:
+            try:
+                callback(summary)
+            except Exception as e:
+                print(f"⚠️ Batch {self.id} callback error: {e}")
+        if not self.future.done():
+            self.future.set_result(summary)
+        return summary
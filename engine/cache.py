@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent metadata cache - analysis results keyed by normalized URL,
+with a TTL and size-bounded LRU eviction (SQLite, stdlib only).
+Also helpers to keep a compact info dict for downloading without a
+second extraction.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from .archive import archive_key
+from .urls import normalize_url
+
+# Format fields worth keeping (stream URLs expire, so they are not cached)
+FORMAT_FIELDS = ('format_id', 'ext', 'width', 'height', 'fps', 'vcodec', 'acodec',
+                 'tbr', 'filesize', 'filesize_approx', 'format_note')
+
+
+def metadata_from_info(info):
+    """Cacheable subset of a yt-dlp info dict"""
+    return {
+        'title': info.get('title', 'Unknown'),
+        'duration': info.get('duration', 0),
+        'uploader': info.get('uploader', 'Unknown'),
+        'thumbnail': info.get('thumbnail', ''),
+        'archive_key': (archive_key(info['extractor_key'], info['id'])
+                        if info.get('extractor_key') and info.get('id') else ''),
+        'formats': [{k: f[k] for k in FORMAT_FIELDS if f.get(k) is not None}
+                    for f in info.get('formats') or []],
+    }
+
+
+# Info dict keys needed to download from a stored info (format selection,
+# downloaders, output template) - everything else (subtitles, captions,
+# thumbnails, description, ...) is left out, and so is the analysis-time
+# format selection (requested_formats etc.), which would override the
+# formats picked for the chosen quality
+INFO_KEEP_KEYS = ('_type', 'id', 'title', 'fulltitle', 'display_id', 'ext', 'formats',
+                  '_format_sort_fields', 'http_headers', 'extractor', 'extractor_key',
+                  'webpage_url', 'webpage_url_basename', 'webpage_url_domain', 'duration',
+                  'start_time', 'end_time', 'is_live', 'was_live', 'live_status', 'age_limit',
+                  'availability', 'epoch', 'timestamp', 'upload_date', 'release_timestamp',
+                  'release_date', 'uploader', 'uploader_id', 'uploader_url', 'channel',
+                  'channel_id', 'channel_url', 'thumbnail')
+
+# Expiry timestamps embedded in signed media URLs (YouTube expire=, CDN Expires=/x-expires=)
+EXPIRE_PATTERN = re.compile(r'[?&/](?:expire|expires|x-expires)[=/](\d{9,11})', re.IGNORECASE)
+
+
+def compact_info(info):
+    """Copy of an analyzed info dict with only INFO_KEEP_KEYS. Formats
+    without audio or video (storyboards, with long fragment lists) are
+    dropped, and identical per-format http_headers share one dict."""
+    compact = {k: info[k] for k in INFO_KEEP_KEYS if k in info}
+    headers = {}
+    formats = []
+    for fmt in compact.get('formats') or []:
+        if fmt.get('vcodec') == 'none' and fmt.get('acodec') == 'none':
+            continue
+        if isinstance(fmt.get('http_headers'), dict):
+            fmt = dict(fmt)
+            key = tuple(sorted(fmt['http_headers'].items()))
+            fmt['http_headers'] = headers.setdefault(key, fmt['http_headers'])
+        formats.append(fmt)
+    if 'formats' in compact:
+        compact['formats'] = formats
+    return compact
+
+
+def info_expiry(info, default_ttl, margin=60):
+    """When the media URLs in info stop working (epoch seconds).
+
+    Uses the earliest expiry found in the format URLs, minus margin;
+    falls back to now + default_ttl when the URLs carry none.
+    """
+    expiries = []
+    for fmt in info.get('formats') or [info]:
+        match = EXPIRE_PATTERN.search(fmt.get('url') or '')
+        if match:
+            expiries.append(int(match.group(1)))
+    if expiries:
+        return min(expiries) - margin
+    return time.time() + default_ttl
+
+
+class MetadataCache:
+    """On-disk cache of video metadata.
+
+    Entries older than `ttl` seconds are treated as misses. When the
+    stored data grows past `max_bytes`, least recently used entries are
+    evicted. Safe to use from several analysis threads.
+    """
+
+    def __init__(self, path, ttl, max_bytes):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS metadata (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS metadata_accessed ON metadata (accessed_at)")
+        self._db.commit()
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM metadata").fetchone()[0]
+
+    def get(self, url):
+        """Cached metadata dict for url, or None if missing/expired"""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT data, fetched_at FROM metadata WHERE key = ?",
+                                   (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE metadata SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, url, metadata):
+        """Store metadata for url, evicting old entries if over budget"""
+        key = normalize_url(url)
+        data = json.dumps(metadata, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM metadata WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?)",
+                             (key, data, len(data), now, now))
+            self._size += len(data) - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop expired entries, then least recently used until under budget"""
+        if self._size <= self.max_bytes:
+            return
+        self._db.execute("DELETE FROM metadata WHERE fetched_at < ?", (time.time() - self.ttl,))
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM metadata").fetchone()[0]
+        rows = self._db.execute("SELECT key, size FROM metadata ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self._size <= self.max_bytes * 0.9:  # leave headroom so we don't evict on every put
+                break
+            self._db.execute("DELETE FROM metadata WHERE key = ?", (key,))
+            self._size -= size
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM metadata")
+            self._db.commit()
+            self._size = 0
+
+    def stats(self):
+        """Entry count, stored bytes and hit/miss counters"""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+        return {'entries': entries, 'bytes': self._size, 'hits': self.hits, 'misses': self.misses}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,1337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless download engine - owns the queue, workers and yt-dlp options.
+The Tk app (or any other front-end) subscribes to engine events.
+"""
+
+import os
+import shutil
+import threading
+import time
+import traceback
+from datetime import datetime
+from urllib.parse import urlparse
+
+from config import (DEFAULT_DOWNLOAD_PATH, SUPPORTED_PLATFORMS, METADATA_CACHE_FILE, DOWNLOAD_ARCHIVE_FILE,
+                    SUBSCRIPTIONS_FILE, SUBSCRIPTION_STOP_AFTER,
+                    METADATA_CACHE_TTL, METADATA_CACHE_MAX_MB, INFO_REUSE_TTL, ANALYSIS_CONCURRENCY,
+                    MAX_CONCURRENT_DOWNLOADS, AUTO_CONCURRENCY_INTERVAL,
+                    DOWNLOAD_PLATFORM_LIMITS, DOWNLOAD_PLATFORM_INTERVALS,
+                    SEGMENTED_CONNECTIONS, SEGMENTED_MIN_SIZE, SEGMENT_SIZE, FRAGMENT_CONNECTIONS,
+                    ARIA2_RPC_PORT, ARIA2_POLL_INTERVAL,
+                    ANALYSIS_PLATFORM_LIMIT, ANALYSIS_PLATFORM_LIMITS)
+
+from .archive import DownloadArchive, FileIndex, archive_key, archive_key_for_url
+from .aria2 import Aria2Daemon, Aria2Error, Aria2YoutubeDL
+from .autotune import ConcurrencyController
+from .bandwidth import BandwidthLimiter, ReceivedCounter
+from .batches import Batch
+from .cache import MetadataCache, metadata_from_info, compact_info, info_expiry
+from .fragments import FragmentBudget
+from .logger import ErrorLogger
+from .models import VideoItem
+from .persistence import QueueDatabase
+from .playlists import PlaylistExpansion
+from .segmented import SegmentedYoutubeDL
+from .store import QueueStore, ACTIVE_STATUSES
+from .subscriptions import SubscriptionStore
+from .transfer import read_queue_file, write_queue_file
+from .urls import canonical_url, dedupe_key, is_playlist_url, item_key, item_platform
+from .workers import DownloadExecutor, KeyedExecutor
+
+# yt-dlp is required for analysis/downloads but not for importing the engine
+try:
+    import yt_dlp
+    YTDLP_AVAILABLE = True
+except ImportError:
+    yt_dlp = None
+    YTDLP_AVAILABLE = False
+
+
+class DownloadInterrupted(Exception):
+    """Raised from the progress hook to stop a transfer (pause/cancel)"""
+
+
+class CustomFilenameHook:
+    """Hook to sanitize ONLY truly invalid Windows chars while keeping full title"""
+
+    @staticmethod
+    def sanitize_windows_filename(filename):
+        """Replace ONLY chars that Windows doesn't allow in filenames"""
+        # Windows forbidden chars and their safe replacements
+        replacements = {
+            '<': '＜',   # Fullwidth less-than
+            '>': '＞',   # Fullwidth greater-than
+            ':': '：',   # Fullwidth colon (keep : spirit)
+            '"': '＂',   # Fullwidth quotation mark
+            '/': '／',   # Fullwidth solidus
+            '\\': '＼',  # Fullwidth reverse solidus
+            '|': '｜',   # Fullwidth vertical line
+            '?': '？',   # Fullwidth question mark (keep ? spirit)
+            '*': '＊',   # Fullwidth asterisk
+        }
+
+        # Replace forbidden chars with visually similar safe chars
+        for forbidden, safe in replacements.items():
+            filename = filename.replace(forbidden, safe)
+
+        # Remove leading/trailing spaces and dots (Windows restriction)
+        filename = filename.strip(' .')
+
+        # Keep everything else including: # @ $ % ^ & ( ) - _ + = [ ] { } ; ' , . ~ `
+        return filename
+
+    def __call__(self, info):
+        """Called after file is downloaded"""
+        try:
+            if 'filepath' in info and os.path.exists(info['filepath']):
+                original_path = info['filepath']
+                directory = os.path.dirname(original_path)
+                filename = os.path.basename(original_path)
+
+                # Sanitize filename
+                safe_filename = self.sanitize_windows_filename(filename)
+
+                if safe_filename != filename:
+                    new_path = os.path.join(directory, safe_filename)
+
+                    # Rename file
+                    try:
+                        if os.path.exists(new_path):
+                            # If target exists, add timestamp
+                            name, ext = os.path.splitext(safe_filename)
+                            timestamp = datetime.now().strftime('%H%M%S')
+                            safe_filename = f"{name}_{timestamp}{ext}"
+                            new_path = os.path.join(directory, safe_filename)
+
+                        os.rename(original_path, new_path)
+                        info['filepath'] = new_path
+                        print(f"\n✅ Filename sanitized (Windows-safe):")
+                        print(f"   {filename}")
+                        print(f"   → {safe_filename}\n")
+                    except Exception as e:
+                        print(f"⚠️ Could not rename file: {e}")
+        except Exception as e:
+            print(f"⚠️ Filename hook error: {e}")
+
+        return [], info  # Return empty postprocessor list and modified info
+
+
+class DownloadEngine:
+    """Headless download engine - queue, scheduling, analysis and downloads
+
+    Front-ends register with subscribe() and receive
+    listener(event, video_item, changes) calls for these events:
+      'added', 'updated', 'removed', 'cleared',
+      'added_many' (changes = {'video_items': [...]}, see add_videos()),
+      'batch_completed' (changes = Batch.summary()), 'unexpected_error',
+      'slots' (changes = worker pool occupancy, see DownloadExecutor.stats()),
+      'analysis' (changes = analysis queue depth, see KeyedExecutor.stats()),
+      'restored' (changes = {'video_items': [...]}, one page from restore_queue()),
+      'expansion' (changes = PlaylistExpansion.stats(), see expand_in_background())
+    Listeners are called from worker threads.
+    """
+
+    SETTINGS = ('download_path', 'default_quality', 'max_concurrent',
+                'audio_only', 'filename_template', 'keep_partial_files',
+                'bandwidth_limit', 'auto_concurrency', 'connections', 'aria2_rpc',
+                'fragment_connections', 'skip_downloaded')
+
+    def __init__(self, download_path=None, metadata_cache_file=METADATA_CACHE_FILE, queue_file=None,
+                 archive_file=DOWNLOAD_ARCHIVE_FILE, subscriptions_file=SUBSCRIPTIONS_FILE):
+        # video_id -> VideoItem, indexed by status, platform and dedupe key
+        self.video_queue = QueueStore(group_of=item_platform,
+                                      key_of=item_key)
+        self.listeners = []
+        self.lock = threading.RLock()  # guards scheduling decisions
+
+        # Settings (see configure())
+        self.download_path = download_path or DEFAULT_DOWNLOAD_PATH
+        self.default_quality = "best"
+        self.max_concurrent = 2
+        self.audio_only = False
+        self.filename_template = "%(title)s.%(ext)s"
+        self.keep_partial_files = False  # keep .part files of cancelled downloads
+        self.bandwidth_limit = 0  # bytes/s shared by all downloads, 0 = unlimited
+        self.bandwidth = BandwidthLimiter(self.bandwidth_limit)
+        self.auto_concurrency = False  # let the tuner pick the pool size
+        self.connections = SEGMENTED_CONNECTIONS  # per file, native downloader / aria2c daemon
+        self.aria2_rpc = False  # send downloads to one aria2c daemon instead of the native downloader
+        self.aria2 = None  # Aria2Daemon, started on first use
+        self.fragment_connections = FRAGMENT_CONNECTIONS  # HLS/DASH fragments in flight, all downloads
+        self.fragments = FragmentBudget(self.fragment_connections)
+        self.skip_downloaded = True  # archived videos / existing files are not downloaded again
+
+        # Per-platform politeness: running downloads, last start, pending wake-up
+        self.platform_limits = dict(DOWNLOAD_PLATFORM_LIMITS)
+        self.platform_intervals = dict(DOWNLOAD_PLATFORM_INTERVALS)
+        self.platform_running = {}  # platform -> downloads holding a worker
+        self.platform_last_start = {}  # platform -> time.monotonic() of last start
+        self._wakeup = None  # (due, Timer) for platforms waiting out their interval
+
+        self.batches = {}  # batch_id -> Batch (still running)
+        self.item_batches = {}  # video_id -> Batch
+
+        os.makedirs(self.download_path, exist_ok=True)
+        self.error_logger = ErrorLogger(self.download_path)
+
+        # Analysis results survive restarts; None disables the cache
+        self.metadata_cache = None
+        if metadata_cache_file:
+            try:
+                self.metadata_cache = MetadataCache(metadata_cache_file, METADATA_CACHE_TTL,
+                                                    METADATA_CACHE_MAX_MB * 1024 * 1024)
+            except Exception as e:
+                print(f"⚠️ Metadata cache disabled: {e}")
+
+        # Completed downloads by extractor/id, and the files already on disk
+        self.archive = None
+        if archive_file:
+            try:
+                self.archive = DownloadArchive(archive_file)
+            except Exception as e:
+                print(f"⚠️ Download archive disabled: {e}")
+        self.file_index = FileIndex(self.download_path)
+
+        # Subscribed channels/playlists and their sync cursors; None disables subscriptions
+        self.subscriptions = None
+        if subscriptions_file:
+            try:
+                self.subscriptions = SubscriptionStore(subscriptions_file)
+            except Exception as e:
+                print(f"⚠️ Subscriptions disabled: {e}")
+
+        # Crash-safe copy of the queue; None keeps the queue in memory only
+        self.queue_db = None
+        if queue_file:
+            try:
+                self.queue_db = QueueDatabase(queue_file)
+            except Exception as e:
+                print(f"⚠️ Queue persistence disabled: {e}")
+
+        # Fixed-size download pool sized from max_concurrent
+        self.executor = DownloadExecutor(self.max_concurrent, name="download",
+                                         on_change=lambda stats: self.emit('slots', None, **stats))
+
+        # Auto mode: pool size follows measured throughput (1..MAX_CONCURRENT_DOWNLOADS)
+        self.autotune = ConcurrencyController(self.apply_concurrency, self.download_demand,
+                                              maximum=MAX_CONCURRENT_DOWNLOADS,
+                                              interval=AUTO_CONCURRENCY_INTERVAL)
+
+        # Bounded analysis pool with per-platform caps (avoids 429s on bulk adds)
+        self.analysis_pool = KeyedExecutor(ANALYSIS_CONCURRENCY, ANALYSIS_PLATFORM_LIMITS,
+                                           default_limit=ANALYSIS_PLATFORM_LIMIT, name="analysis",
+                                           on_change=lambda stats: self.emit('analysis', None, **stats))
+
+        # Subscription syncs list one channel/playlist at a time, on their own
+        # worker, so they never take analysis slots from user-added URLs
+        self.sync_pool = DownloadExecutor(1, name="sync")
+
+    # ------------------------------------------------------------------
+    # Settings & events
+    # ------------------------------------------------------------------
+
+    def configure(self, **settings):
+        """Update engine settings (see SETTINGS)"""
+        for key, value in settings.items():
+            if key not in self.SETTINGS:
+                raise AttributeError(f"Unknown engine setting: {key}")
+            if key in ('max_concurrent', 'connections'):
+                value = max(1, int(value))
+            elif key == 'fragment_connections':
+                value = max(1, int(value))
+                self.fragments.set_total(value)
+            elif key == 'bandwidth_limit':
+                value = max(0, int(value or 0))
+                self.bandwidth.set_rate(value)
+            elif key == 'download_path':
+                os.makedirs(value, exist_ok=True)
+                self.file_index.set_folder(value)
+            setattr(self, key, value)
+
+        if 'auto_concurrency' in settings:
+            if self.auto_concurrency:
+                self.autotune.start(self.executor.size)
+            else:
+                self.autotune.stop()
+                self.apply_concurrency(self.max_concurrent)
+        elif 'max_concurrent' in settings and not self.auto_concurrency:
+            self.apply_concurrency(self.max_concurrent)
+
+        if self.aria2:
+            self.aria2.set_options(self.aria2_options())
+
+    def apply_concurrency(self, size):
+        """Resize the download pool and fill any new slots"""
+        self.executor.resize(size)
+        if self.aria2:
+            self.aria2.set_options(self.aria2_options())
+        self.refill()
+
+    def aria2_options(self):
+        """Engine settings as aria2c global options"""
+        return {
+            'max-overall-download-limit': self.bandwidth_limit,
+            'max-concurrent-downloads': self.executor.size,
+            'split': self.connections,
+            'max-connection-per-server': min(16, self.connections),  # aria2c maximum
+        }
+
+    def aria2_daemon(self):
+        """The shared aria2c daemon, started on first use"""
+        with self.lock:
+            if self.aria2 is None:
+                self.aria2 = Aria2Daemon(port=ARIA2_RPC_PORT, poll_interval=ARIA2_POLL_INTERVAL,
+                                         options=self.aria2_options())
+        self.aria2.start()
+        return self.aria2
+
+    def download_demand(self):
+        """Downloads that could run right now (running + waiting)"""
+        return self.video_queue.count("downloading") + self.video_queue.count("pending")
+
+    def slot_usage(self):
+        """Download pool occupancy (size, busy, queued, delayed)"""
+        return self.executor.stats()
+
+    def subscribe(self, listener):
+        """Register a listener called as listener(event, video_item, changes)"""
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Remove a previously registered listener"""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def emit(self, event, video_item=None, **changes):
+        """Notify all listeners of an engine event"""
+        for listener in list(self.listeners):
+            try:
+                listener(event, video_item, changes)
+            except Exception as e:
+                print(f"⚠️ Engine listener error ({event}): {e}")
+
+    def update_video(self, video_item, **changes):
+        """Apply changes to a video item and notify listeners"""
+        for key, value in changes.items():
+            if key == 'status':
+                self.video_queue.set_status(video_item, value)
+            else:
+                setattr(video_item, key, value)
+        if self.queue_db and video_item.id in self.video_queue:
+            self.queue_db.record(video_item, urgent='status' in changes)
+        self.emit('updated', video_item, **changes)
+
+        if 'status' in changes:
+            self.track_batch_item(video_item, changes['status'])
+
+    # ------------------------------------------------------------------
+    # Queue management
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def validate_url(url):
+        """Validate if URL is supported"""
+        try:
+            parsed = urlparse(url)
+            domain = parsed.netloc.lower()
+            return any(supported in domain for supported in SUPPORTED_PLATFORMS)
+        except:
+            return False
+
+    def is_queued(self, url):
+        """True if the video behind url (any URL form) is already in the queue"""
+        return self.video_queue.find(dedupe_key(url)) is not None
+
+    def add_video(self, url, quality=None, analyze=True, **fields):
+        """Add video to download queue and analyze it in background.
+        Extra keyword fields (e.g. title) are set on the VideoItem.
+        Returns None if the same video is already queued."""
+        video_item = VideoItem(canonical_url(url), quality or self.default_quality)
+        for key, value in fields.items():
+            setattr(video_item, key, value)
+
+        if not self.video_queue.add(video_item, unique=True):
+            return None
+        if self.queue_db:
+            self.queue_db.record(video_item, urgent=True)
+        self.emit('added', video_item)
+
+        if self.skip_if_downloaded(video_item):
+            return video_item
+        if analyze:
+            self.queue_analysis(video_item)
+
+        return video_item
+
+    # Record keys copied onto new VideoItems by add_videos()
+    RECORD_FIELDS = ('title', 'duration', 'uploader', 'thumbnail_url', 'archive_key', 'flat')
+
+    def add_videos(self, records):
+        """Add many videos at once from dicts with 'url' and optional
+        'quality' and RECORD_FIELDS; emits one 'added_many' event. Videos
+        without a title are queued for analysis. Returns the new VideoItems
+        (videos already queued are left out)."""
+        video_items = []
+        for record in records:
+            video_item = VideoItem(canonical_url(record['url']), record.get('quality') or self.default_quality)
+            for key in self.RECORD_FIELDS:
+                if record.get(key):
+                    setattr(video_item, key, record[key])
+            video_items.append(video_item)
+
+        video_items = self.video_queue.add_many(video_items, unique=True)
+        if self.queue_db:
+            for video_item in video_items:
+                self.queue_db.record(video_item)
+        self.emit('added_many', None, video_items=video_items)
+
+        for video_item in video_items:
+            if self.skip_if_downloaded(video_item):
+                continue
+            if video_item.title == "Loading...":
+                self.queue_analysis(video_item)
+        return video_items
+
+    def import_queue(self, file_path, on_progress=None):
+        """Stream videos from a queue file (NDJSON or URL list) into the
+        queue in chunks. on_progress(imported) runs after each chunk.
+        Returns (imported, skipped) counts; unsupported and duplicate URLs
+        are skipped."""
+        imported = skipped = 0
+        for records in read_queue_file(file_path):
+            valid = [r for r in records if r.get('url') and self.validate_url(r['url'])]
+            added = len(self.add_videos(valid))
+            skipped += len(records) - added
+            imported += added
+            if on_progress:
+                on_progress(imported)
+        return imported, skipped
+
+    def export_queue(self, file_path):
+        """Stream the queue to file_path (NDJSON, or bare URLs for .txt).
+        Returns the number of exported videos."""
+        return write_queue_file(file_path, self.video_queue.values())
+
+    def remove_video(self, video_id):
+        """Remove a video from the queue"""
+        video_item = self.video_queue.pop(video_id, None)
+        if video_item:
+            if self.queue_db:
+                self.queue_db.delete(video_id)
+            self.emit('removed', video_item)
+            self.track_batch_item(video_item, "cancelled")
+
+    def clear_queue(self):
+        """Remove every video from the queue"""
+        video_items = self.video_queue.values()
+        self.video_queue.clear()
+        if self.queue_db:
+            self.queue_db.clear()
+        self.emit('cleared')
+        for video_item in video_items:
+            self.track_batch_item(video_item, "cancelled")
+
+    def restore_queue(self):
+        """Load the persisted queue without re-analysis.
+
+        Items are restored page by page, with one 'restored' event per
+        page, so the first videos show up immediately. Returns the number
+        of restored videos.
+        """
+        if not self.queue_db:
+            return 0
+        restored = 0
+        unanalyzed = []
+        for page in self.queue_db.load():
+            video_items = [v for v in page if v.id not in self.video_queue]
+            self.video_queue.add_many(video_items)
+            self.emit('restored', None, video_items=video_items)
+            restored += len(video_items)
+            unanalyzed.extend(v for v in video_items
+                              if v.status == "pending" and v.title == "Loading...")
+
+        # Videos added but never analyzed before the restart
+        for video_item in unanalyzed:
+            self.queue_analysis(video_item)
+        return restored
+
+    def close(self):
+        """Flush persistent state (call on application exit)"""
+        if self.queue_db:
+            self.queue_db.close()
+        if self.metadata_cache:
+            self.metadata_cache.close()
+        if self.aria2:
+            self.aria2.stop()
+        if self.archive:
+            self.archive.close()
+        if self.subscriptions:
+            self.subscriptions.close()
+        self.error_logger.close()
+
+    def expand_playlist(self, url):
+        """Return the entry URLs of a playlist, or None if url is not a playlist"""
+        if not is_playlist_url(url):
+            return None
+        if not YTDLP_AVAILABLE:
+            raise ImportError("yt-dlp not installed")
+        try:
+            return [record['url'] for record in self.iter_playlist(url)]
+        except yt_dlp.DownloadError:
+            # Not a playlist, fall back to single
+            return None
+
+    def iter_playlist(self, url):
+        """Yield the entries of a playlist or channel while its pages are
+        fetched (flat and lazy - no per-video extraction), as add_videos()
+        records filled from the flat entry's metadata"""
+        if not YTDLP_AVAILABLE:
+            raise ImportError("yt-dlp not installed")
+
+        opts = {'quiet': True, 'extract_flat': 'in_playlist', 'lazy_playlist': True}
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            # Follow redirects (e.g. watch?v=...&list=..., channel -> videos tab)
+            for _ in range(3):
+                if info.get('_type') not in ('url', 'url_transparent'):
+                    break
+                info = ydl.extract_info(info['url'], download=False, process=False,
+                                        ie_key=info.get('ie_key'))
+
+            for entry in info.get('entries') or []:
+                if not entry or entry.get('_type') == 'playlist':
+                    continue  # nested playlists (channel tabs) are not expanded
+                video_url = entry.get('url') or entry.get('webpage_url')
+                if video_url and self.validate_url(video_url):
+                    yield self.flat_record(video_url, entry)
+
+    @staticmethod
+    def flat_record(video_url, entry):
+        """add_videos() record from a flat playlist entry. With a title the
+        video is not analyzed when queued; the download extracts it."""
+        record = {'url': video_url, 'flat': True}
+        if entry.get('title'):
+            record['title'] = entry['title']
+            record['duration'] = entry.get('duration') or 0
+            record['uploader'] = entry.get('uploader') or entry.get('channel') or ''
+            thumbnails = entry.get('thumbnails') or []
+            record['thumbnail_url'] = entry.get('thumbnail') or (thumbnails[-1].get('url', '') if thumbnails else '')
+        if entry.get('ie_key') and entry.get('id'):
+            record['archive_key'] = archive_key(entry['ie_key'], entry['id'])
+        return record
+
+    def expand_in_background(self, url, quality=None, start=False, chunk_size=50, flush_interval=0.5):
+        """Expand a playlist or channel on a background thread.
+
+        Entries are queued in chunks (chunk_size entries, or whatever
+        arrived within flush_interval seconds) while later pages are still
+        being fetched; 'expansion' events report progress. With start, the
+        entries download right away as one batch that completes after the
+        last entry. Returns a PlaylistExpansion (cancel() stops it).
+        """
+        expansion = PlaylistExpansion(url)
+        threading.Thread(target=self.run_expansion, name="playlist-expansion", daemon=True,
+                         args=(expansion, quality, start, None, chunk_size, flush_interval)).start()
+        return expansion
+
+    def run_expansion(self, expansion, quality=None, start=False, cursor=None,
+                      chunk_size=50, flush_interval=0.5):
+        """List expansion.url and queue its entries (see expand_in_background).
+
+        With a cursor (entry keys seen by the last sync) listing stops after
+        SUBSCRIPTION_STOP_AFTER known entries in a row - later pages are never
+        fetched - and the subscription's cursor advances to the new entries.
+        """
+        chunk = []
+        last_flush = time.monotonic()
+        known_streak = 0
+        try:
+            if expansion.cancelled:
+                return  # cancelled while waiting for a pool slot
+            for record in self.iter_playlist(expansion.url):
+                if expansion.cancelled:
+                    break
+                if cursor is not None:
+                    key = record.get('archive_key') or dedupe_key(record['url'])
+                    if key in cursor:
+                        known_streak += 1
+                        if known_streak >= SUBSCRIPTION_STOP_AFTER:
+                            break
+                        continue
+                    known_streak = 0
+                    expansion.keys.append(key)
+                expansion.found += 1
+                chunk.append(dict(record, quality=quality or self.default_quality))
+                if len(chunk) >= chunk_size or time.monotonic() - last_flush >= flush_interval:
+                    self._flush_expansion(expansion, chunk, start)
+                    chunk = []
+                    last_flush = time.monotonic()
+            if chunk and not expansion.cancelled:
+                self._flush_expansion(expansion, chunk, start)
+            if cursor is not None and not expansion.cancelled and self.subscriptions:
+                self.subscriptions.advance(expansion.url, expansion.keys)
+        except Exception as e:
+            expansion.error = e
+        finally:
+            if expansion.batch:
+                self.release_batch(expansion.batch)
+            stats = dict(expansion.stats(), done=True)
+            expansion.future.set_result(stats)
+            self.emit('expansion', None, **stats)
+
+    def _flush_expansion(self, expansion, chunk, start):
+        """Queue one chunk of entries (and add them to the expansion's batch)"""
+        # Under the lock so no worker dispatches an entry before it joins the batch
+        with self.lock:
+            video_items = self.add_videos(chunk)
+            expansion.added += len(video_items)
+            if start and video_items:
+                if expansion.batch is None:
+                    expansion.batch = self.start_batch(set(), hold=True)
+                self.extend_batch(expansion.batch, [v.id for v in video_items])
+        self.emit('expansion', None, **expansion.stats())
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def add_subscription(self, url, quality=None):
+        """Follow a channel or playlist; sync_subscriptions() queues its new videos"""
+        if not self.subscriptions:
+            raise RuntimeError("Subscriptions are disabled")
+        self.subscriptions.add(url, quality)
+
+    def remove_subscription(self, url):
+        if self.subscriptions:
+            self.subscriptions.remove(url)
+
+    def sync_subscriptions(self, urls=None, start=False):
+        """Queue the videos added to subscribed channels/playlists (all of
+        them unless urls is given) since their last sync. Listings run one
+        after another on the sync worker. Returns one PlaylistExpansion per
+        subscription."""
+        expansions = []
+        for subscription in (self.subscriptions.all() if self.subscriptions else []):
+            if urls is not None and subscription['url'] not in urls:
+                continue
+            expansion = PlaylistExpansion(subscription['url'], sync=True)
+            self.sync_pool.submit(self._sync_subscription, expansion, subscription['quality'], start)
+            expansions.append(expansion)
+        return expansions
+
+    def _sync_subscription(self, expansion, quality, start):
+        self.run_expansion(expansion, quality, start, set(self.subscriptions.cursor(expansion.url)))
+
+    # ------------------------------------------------------------------
+    # Analysis
+    # ------------------------------------------------------------------
+
+    def queue_analysis(self, video_item):
+        """Analyze a video in the background analysis pool"""
+        self.update_video(video_item, status="analyzing")
+        self.analysis_pool.submit(item_platform(video_item), self._analyze_queued, video_item)
+
+    def analyze_details(self, video_id):
+        """Run the deferred full analysis of a video queued from a flat
+        playlist entry (e.g. when the user opens its details)"""
+        video_item = self.video_queue.get(video_id)
+        if video_item and video_item.flat and video_item.status == "pending":
+            video_item.flat = False
+            self.queue_analysis(video_item)
+
+    def _analyze_queued(self, video_item):
+        # Skip videos removed or cancelled while waiting for a slot
+        if video_item.id in self.video_queue and not video_item.cancel_flag:
+            self.analyze_video(video_item)
+
+    def analyze_video(self, video_item):
+        """Analyze video to get metadata (from the metadata cache when possible)"""
+        try:
+            # Cache hit - no network round-trip
+            if self.metadata_cache:
+                metadata = self.metadata_cache.get(video_item.url)
+                if metadata:
+                    self.apply_metadata(video_item, metadata)
+                    return
+
+            if not YTDLP_AVAILABLE:
+                raise ImportError("yt-dlp not installed")
+
+            self.update_video(video_item, status="analyzing")
+
+            # Special handling for TikTok
+            ydl_opts = {
+                'quiet': True,
+                'no_warnings': True,
+                'extract_flat': False,
+            }
+
+            # Platform-specific configurations
+            if 'tiktok.com' in video_item.url:
+                ydl_opts.update({
+                    'http_headers': {
+                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                        'Accept-Language': 'en-us,en;q=0.5',
+                        'Accept-Encoding': 'gzip,deflate',
+                        'Accept-Charset': 'ISO-8859-1,utf-8;q=0.7,*;q=0.7',
+                        'Keep-Alive': '300',
+                        'Connection': 'keep-alive',
+                    },
+                    'cookiefile': None,
+                    'cookiesfrombrowser': None,
+                })
+
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                try:
+                    info = ydl.extract_info(video_item.url, download=False)
+
+                    # Keep the info so the download can skip a second extraction
+                    if info.get('_type', 'video') == 'video' and info.get('formats'):
+                        video_item.info = compact_info(ydl.sanitize_info(info, remove_private_keys=True))
+                        video_item.info_expires = info_expiry(video_item.info, INFO_REUSE_TTL)
+
+                    metadata = metadata_from_info(info)
+                    if self.metadata_cache:
+                        self.metadata_cache.put(video_item.url, metadata)
+                    self.apply_metadata(video_item, metadata)
+
+                except yt_dlp.DownloadError as e:
+                    error_msg = str(e)
+
+                    # Provide specific error messages for common issues
+                    if "Private video" in error_msg:
+                        video_item.error_message = "Video is private or unavailable"
+                    elif "Video unavailable" in error_msg:
+                        video_item.error_message = "Video not found or region blocked"
+                    elif "Sign in to confirm your age" in error_msg:
+                        video_item.error_message = "Age-restricted video"
+                    elif "This video is not available" in error_msg:
+                        video_item.error_message = "Video removed or restricted"
+                    elif "tiktok" in video_item.url.lower() and "403" in error_msg:
+                        video_item.error_message = "TikTok access blocked - try different URL format"
+                    else:
+                        video_item.error_message = f"Analysis failed: {error_msg[:100]}"
+
+                    self.update_video(video_item, status="error")
+
+        except ImportError:
+            video_item.error_message = "yt-dlp not installed"
+            self.update_video(video_item, status="error")
+        except Exception as e:
+            video_item.error_message = f"Unexpected error: {str(e)[:100]}"
+            self.update_video(video_item, status="error")
+
+    def apply_metadata(self, video_item, metadata):
+        """Fill a video from analysis metadata and mark it ready"""
+        # 🔥 Keep FULL title - no truncation!
+        video_item.duration = metadata.get('duration', 0)
+        video_item.uploader = metadata.get('uploader', 'Unknown')
+        video_item.thumbnail_url = metadata.get('thumbnail', '')
+        video_item.formats = metadata.get('formats', [])
+        video_item.archive_key = metadata.get('archive_key') or video_item.archive_key
+        video_item.flat = False
+        changes = {'title': metadata.get('title', 'Unknown')}
+        if self.skip_if_downloaded(video_item, **changes):
+            return
+        if not video_item.cancel_flag:
+            changes['status'] = "pending"
+        self.update_video(video_item, **changes)
+
+        # Part of a running batch (e.g. a playlist still expanding) - start it
+        if video_item.id in self.item_batches:
+            self.check_and_start_more()
+
+    # ------------------------------------------------------------------
+    # Download archive
+    # ------------------------------------------------------------------
+
+    def skip_if_downloaded(self, video_item, **changes):
+        """Mark a pending video completed (applying changes) if the archive
+        already has it. No network call; True if skipped."""
+        if not (self.skip_downloaded and self.archive) or video_item.status not in ("pending", "analyzing"):
+            return False
+
+        key = video_item.archive_key or archive_key_for_url(video_item.url)
+        entry = self.archive.get(key) if key else None
+        if entry is None:
+            return False
+
+        title, video_item.filename = entry
+        changes.update(status="completed", progress=100)
+        if title and 'title' not in changes and video_item.title == "Loading...":
+            changes['title'] = title
+        self.update_video(video_item, **changes)
+        return True
+
+    def expected_filename(self, ydl, info):
+        """Name the download of info will get in the download folder"""
+        filename = os.path.basename(ydl.prepare_filename(info))
+        if self.audio_only or info.get('_audio_only'):
+            filename = os.path.splitext(filename)[0] + '.mp3'
+        return CustomFilenameHook.sanitize_windows_filename(filename)
+
+    def record_download(self, video_item, key):
+        """Remember a completed download in the archive and file index"""
+        if video_item.filename:
+            self.file_index.add(video_item.filename)
+        key = key or video_item.archive_key or archive_key_for_url(video_item.url)
+        if self.archive and key:
+            self.archive.add(key, video_item.title, video_item.filename)
+
+    def take_info(self, video_item):
+        """Analyzed info for a download, or None if missing or expired.
+        The info is used once; retries re-extract fresh media URLs."""
+        info, video_item.info = video_item.info, None
+        if info and time.time() < video_item.info_expires:
+            return info
+        return None
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def start_batch(self, video_ids=None, on_complete=None, hold=False):
+        """Start downloading pending videos as a new batch.
+
+        Only pending videos that are not already part of a running batch
+        are included (all of them unless video_ids is given). Returns the
+        Batch, or None if there was nothing to start. on_complete(summary)
+        runs as soon as the last video finishes; batches may overlap.
+        A held batch can grow with extend_batch() until release_batch().
+        """
+        with self.lock:
+            video_items = [v for v in self.video_queue.items("pending")
+                           if v.id not in self.item_batches
+                           and (video_ids is None or v.id in video_ids)]
+            if not video_items and not hold:
+                return None
+
+            batch = Batch(video_items, on_complete)
+            batch.held = hold
+            self.batches[batch.id] = batch
+            for video_item in video_items:
+                self.item_batches[video_item.id] = batch
+
+        # Start initial downloads up to concurrency limit
+        self.check_and_start_more()
+        return batch
+
+    def extend_batch(self, batch, video_ids):
+        """Add active videos (pending, still analyzing, already started) to a
+        held batch and start them; analyzing ones start once analyzed"""
+        with self.lock:
+            video_items = [self.video_queue[video_id] for video_id in video_ids
+                           if video_id in self.video_queue and video_id not in self.item_batches
+                           and self.video_queue[video_id].status in ACTIVE_STATUSES]
+            batch.add(video_items)
+            for video_item in video_items:
+                self.item_batches[video_item.id] = batch
+        self.check_and_start_more()
+
+    def release_batch(self, batch):
+        """Let a held batch complete once its last video finishes"""
+        with self.lock:
+            if not batch.release():
+                return
+            self._end_batch(batch)
+        self._complete_batch(batch)
+
+    def track_batch_item(self, video_item, status):
+        """Update the item's batch and complete it if this was the last one"""
+        with self.lock:
+            batch = self.item_batches.get(video_item.id)
+            if not batch or not batch.item_changed(video_item, status):
+                return
+            self._end_batch(batch)
+        self._complete_batch(batch)
+
+    def _end_batch(self, batch):
+        """Forget a finished batch (caller holds self.lock)"""
+        del self.batches[batch.id]
+        for video_id in batch.video_ids:
+            self.item_batches.pop(video_id, None)
+
+    def _complete_batch(self, batch):
+        summary = batch.complete()
+        self.error_logger.log_batch_summary(summary)
+        self.emit('batch_completed', None, **summary)
+
+    def check_and_start_more(self):
+        """Start next pending downloads up to concurrency limit"""
+        with self.lock:
+            # each running download holds a pool slot
+            free_slots = self.executor.size - self.video_queue.count("downloading")
+            held = set()  # platforms whose next video still has its old worker
+            while free_slots > 0:
+                video = self.next_pending(held)
+                if video is None:
+                    break
+                if self.skip_if_downloaded(video):
+                    continue  # finished by an earlier item or run
+                if video.running:
+                    # Resumed/retried before its stopped worker exited; that
+                    # worker calls back here once it is gone
+                    held.add(self.video_queue.group_of(video.id))
+                    continue
+                self.start_video_download(video.id)
+                free_slots -= 1
+
+    def downloads_running(self):
+        """True while a batch or any transfer is under way"""
+        return bool(self.batches) or self.video_queue.count("downloading") > 0
+
+    def refill(self):
+        """Fill free download slots, but only while downloads are running -
+        a settings change or pausing one video never starts pending videos
+        the user hasn't started"""
+        if self.downloads_running():
+            self.check_and_start_more()
+
+    def start_or_queue(self, video_item):
+        """Start one video the user (or a retry) asked for: behind the
+        running downloads if there are any, otherwise right away on its own"""
+        if self.downloads_running():
+            self.check_and_start_more()
+        else:
+            self.start_video_download(video_item.id)
+
+    def next_pending(self, held=()):
+        """Oldest pending video of the platform that started least recently,
+        skipping platforms at their cap or inside their start interval"""
+        now = time.monotonic()
+        wait = None
+        platforms = sorted(self.video_queue.groups("pending"),
+                           key=lambda platform: self.platform_last_start.get(platform, 0))
+        for platform in platforms:
+            if platform in held:
+                continue
+            limit = self.platform_limits.get(platform)
+            if limit and self.platform_running.get(platform, 0) >= limit:
+                continue
+            last_start = self.platform_last_start.get(platform)
+            if last_start is not None:
+                ready_in = last_start + self.platform_intervals.get(platform, 0) - now
+                if ready_in > 0:
+                    wait = ready_in if wait is None else min(wait, ready_in)
+                    continue
+            return self.video_queue.first("pending", platform)
+
+        if wait is not None:
+            self.schedule_wakeup(wait)
+        return None
+
+    def schedule_wakeup(self, delay):
+        """Refill once a throttled platform may start again"""
+        due = time.monotonic() + delay
+        if self._wakeup and self._wakeup[0] <= due and self._wakeup[1].is_alive():
+            return
+        if self._wakeup:
+            self._wakeup[1].cancel()
+        timer = threading.Timer(delay, self.refill)
+        timer.daemon = True
+        self._wakeup = (due, timer)
+        timer.start()
+
+    def start_video_download(self, video_id):
+        """Dispatch a specific video to the download pool"""
+        with self.lock:
+            video_item = self.video_queue.get(video_id)
+            if not video_item or video_item.status in ["downloading", "completed"] or video_item.running:
+                return
+
+            # Mark as downloading before dispatch so it is never queued twice
+            self.update_video(video_item, status="downloading")
+            platform = self.video_queue.group_of(video_id)
+            self.platform_running[platform] = self.platform_running.get(platform, 0) + 1
+            self.platform_last_start[platform] = time.monotonic()
+            video_item.running = True
+            self.executor.submit(self.run_download, video_item, platform, video_item.generation)
+
+    def run_download(self, video_item, platform, generation):
+        """Pool job: download, then release the platform slot and refill"""
+        try:
+            self.download_video_worker(video_item, generation)
+        finally:
+            with self.lock:
+                self.platform_running[platform] -= 1
+                video_item.running = False
+                cleanup = video_item.cancel_flag
+            if cleanup:
+                self.remove_partial_files(video_item)
+            # After finishing one download, start more if pending
+            try:
+                if video_item.status == "pending":
+                    self.start_or_queue(video_item)  # resumed/retried while stopping
+                self.refill()
+            except Exception:
+                pass
+
+    def resume_after_backoff(self, video_id):
+        """Put a video waiting for retry back in line"""
+        video_item = self.video_queue.get(video_id)
+        if video_item and video_item.status == "retrying":
+            self.update_video(video_item, status="pending")
+            self.start_or_queue(video_item)
+
+    def throttle(self, video_item, delay, generation=None):
+        """Sleep off a bandwidth deficit, waking early on pause/cancel"""
+        deadline = time.monotonic() + delay
+        while not self.interrupted(video_item, generation):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.2))
+
+    @staticmethod
+    def interrupted(video_item, generation=None):
+        """True if the video's transfer should stop now: paused or cancelled,
+        or (for a worker started at `generation`) paused/cancelled and put
+        back in line since"""
+        return (video_item.pause_requested or video_item.cancel_flag
+                or (generation is not None and video_item.generation != generation))
+
+    def pause_video_download(self, video_id):
+        """Pause a video. A running transfer stops at its next progress tick,
+        freeing its slot; the partial file is kept for resume."""
+        with self.lock:
+            video_item = self.video_queue.get(video_id)
+            if not video_item or video_item.status not in ("pending", "downloading", "retrying"):
+                return None
+            video_item.pause_requested = True
+            video_item.generation += 1
+            self.update_video(video_item, status="paused", speed=0, eta=0)
+        self.refill()
+        return video_item
+
+    def resume_video_download(self, video_id):
+        """Resume a paused video; yt-dlp continues from the .part file"""
+        with self.lock:
+            video_item = self.video_queue.get(video_id)
+            if not video_item or video_item.status != "paused":
+                return None
+            video_item.pause_requested = False
+            self.update_video(video_item, status="pending")
+        self.start_or_queue(video_item)
+        return video_item
+
+    def cancel_video_download(self, video_id):
+        """Cancel a video. A running transfer stops at its next progress tick
+        and frees its slot; partial files are removed unless keep_partial_files."""
+        with self.lock:
+            video_item = self.video_queue.get(video_id)
+            if not video_item or video_item.status in ("completed", "cancelled"):
+                return video_item
+            running = video_item.running
+            video_item.cancel_flag = True
+            video_item.generation += 1
+            self.update_video(video_item, status="cancelled", speed=0, eta=0)
+
+        # A running worker cleans up once its transfer has stopped
+        if not running:
+            self.remove_partial_files(video_item)
+        self.refill()
+        return video_item
+
+    def remove_partial_files(self, video_item):
+        """Delete a cancelled video's temp files (unless configured to keep them)"""
+        if self.keep_partial_files:
+            return
+        for path in video_item.partial_files:
+            for candidate in (path, path + '.ytdl', path + '.aria2', path + '.segments'):
+                try:
+                    if os.path.exists(candidate):
+                        os.remove(candidate)
+                except OSError as e:
+                    print(f"⚠️ Could not remove partial file {candidate}: {e}")
+        video_item.partial_files.clear()
+
+    def retry_video_download(self, video_id):
+        """Retry failed video download"""
+        with self.lock:
+            video_item = self.video_queue.get(video_id)
+            if not video_item:
+                return
+            video_item.pause_requested = False
+            video_item.cancel_flag = False
+            self.update_video(video_item, status="pending", progress=0)
+        self.start_or_queue(video_item)
+
+    def retry_failed_downloads(self):
+        """Reset all failed downloads and start a new batch. Returns count reset."""
+        failed_videos = self.video_queue.items("error")
+
+        for video in failed_videos:
+            video.error_message = ""
+            self.update_video(video, status="pending", progress=0)
+
+        if failed_videos:
+            self.start_batch()
+        return len(failed_videos)
+
+    # ------------------------------------------------------------------
+    # Downloads
+    # ------------------------------------------------------------------
+
+    def get_format_selector(self, quality):
+        """Get format selector for yt-dlp with FFmpeg fallbacks"""
+        # Try formats that don't require FFmpeg first, then fallback
+        quality_map = {
+            "best": "best[ext=mp4]/best[ext=webm]/best[ext=flv]/best",
+            "1080p": "best[height<=1080][ext=mp4]/best[height<=1080][ext=webm]/best[height<=1080]",
+            "720p": "best[height<=720][ext=mp4]/best[height<=720][ext=webm]/best[height<=720]",
+            "480p": "best[height<=480][ext=mp4]/best[height<=480][ext=webm]/best[height<=480]",
+            "360p": "best[height<=360][ext=mp4]/best[height<=360][ext=webm]/best[height<=360]",
+            "worst": "worst[ext=mp4]/worst[ext=webm]/worst"
+        }
+        return quality_map.get(quality, "best[ext=mp4]/best[ext=webm]/best")
+
+    def build_ydl_opts(self, video_item, progress_hook, fragments=1):
+        """Build yt-dlp options for downloading a video.
+        fragments is the number of HLS/DASH fragments fetched in parallel."""
+        # Enhanced yt-dlp options
+        ydl_opts = {
+            'outtmpl': os.path.join(self.download_path, self.filename_template),
+            'progress_hooks': [progress_hook],
+            'format': self.get_format_selector(video_item.quality),
+            # Auto-fix MPEG-TS in MP4 container or AAC timestamps
+            'fixup': 'detect_or_warn',
+            'noplaylist': True,
+            'extract_flat': False,
+            'writeinfojson': False,
+            'writethumbnail': False,
+            'ignoreerrors': False,
+            'continuedl': True,  # resume paused/interrupted downloads from .part files
+            'retries': 3,
+            'fragment_retries': 3,
+            'concurrent_fragment_downloads': fragments,
+            'timeout': 30,
+            # FFmpeg options
+            'prefer_ffmpeg': True,
+            'ffmpeg_location': None,  # Let yt-dlp find it
+            # 🔥 Filename options - Keep full title, only replace truly invalid chars
+            'restrictfilenames': False,  # Keep Unicode and special chars like : # ?
+            'windowsfilenames': False,   # Don't auto-sanitize, we'll do custom replacement
+        }
+
+        # Audio extraction if enabled
+        if self.audio_only or video_item.extract_audio:
+            ydl_opts.update({
+                'format': 'bestaudio/best',
+                'postprocessors': [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'mp3',
+                    'preferredquality': '192',
+                }],
+            })
+
+        # Platform-specific configurations
+        if 'tiktok.com' in video_item.url:
+            ydl_opts.update({
+                'format': 'best[ext=mp4]/best',
+                'http_headers': {
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                    'Referer': 'https://www.tiktok.com/',
+                },
+                'cookiefile': None,
+            })
+        elif 'instagram.com' in video_item.url:
+            ydl_opts.update({
+                'format': 'best[ext=mp4]/best',
+            })
+        elif 'facebook.com' in video_item.url or 'fb.watch' in video_item.url:
+            ydl_opts.update({
+                'format': 'best[ext=mp4]/best',
+            })
+
+        # Add custom filename hook
+        ydl_opts['postprocessor_hooks'] = [CustomFilenameHook()]
+
+        return ydl_opts
+
+    def create_ydl(self, ydl_opts):
+        """YoutubeDL for a download; files go to the aria2c daemon in RPC mode,
+        otherwise large files are fetched over several connections by the
+        native segmented downloader. Both report progress through the hooks,
+        so pause/cancel can stop them (a per-file aria2c process can't be:
+        yt-dlp runs it to the end without calling any hook)."""
+        if self.aria2_rpc and shutil.which('aria2c'):
+            try:
+                return Aria2YoutubeDL(ydl_opts, daemon=self.aria2_daemon())
+            except (Aria2Error, OSError) as e:
+                print(f"⚠️ aria2c daemon unavailable, using built-in downloader: {e}")
+        return SegmentedYoutubeDL(ydl_opts, connections=self.connections,
+                                  min_size=SEGMENTED_MIN_SIZE, segment_size=SEGMENT_SIZE)
+
+    def download_video_worker(self, video_item, generation=None):
+        """Worker function for downloading video. `generation` is the item's
+        generation at dispatch; a pause or cancel since then stops this worker
+        even if the video was resumed/retried in the meantime."""
+        if not YTDLP_AVAILABLE:
+            video_item.error_message = "yt-dlp not installed"
+            self.update_video(video_item, status="error")
+            return
+
+        fragments = self.fragments.acquire(self.executor.size)
+        received = ReceivedCounter()  # new bytes per tick (resumed bytes excluded)
+        finished = {'key': None}  # archive key of the downloaded video
+        started = time.monotonic()
+        try:
+            if self.interrupted(video_item, generation):
+                return  # paused/cancelled before a worker picked it up
+
+            def progress_hook(d):
+                # Stop the transfer at the next tick; the .part file stays for resume
+                if self.interrupted(video_item, generation):
+                    raise DownloadInterrupted(video_item.id)
+
+                if d.get('tmpfilename'):
+                    video_item.partial_files.add(d['tmpfilename'])
+
+                if d['status'] == 'downloading':
+                    # Guard against None values (some extractors return None for total_bytes)
+                    total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+                    downloaded = d.get('downloaded_bytes') or 0
+                    speed = d.get('speed', 0) or 0
+                    eta = d.get('eta', 0) or 0
+
+                    # Charge new bytes to the shared bandwidth budget and
+                    # count them as throughput for the auto tuner
+                    delta = received.delta(downloaded)
+                    self.autotune.record_bytes(delta)
+                    delay = self.bandwidth.consume(delta, wait=False)
+                    # The aria2c daemon throttles itself (global limit)
+                    if delay and 'gid' not in d:
+                        self.throttle(video_item, delay, generation)
+
+                    # Determine progress mode and calculate progress
+                    if isinstance(total, (int, float)) and total > 0 and isinstance(downloaded, (int, float)):
+                        # Determinate mode - we know total size
+                        progress = (downloaded / total) * 100
+                        progress = max(0.0, min(100.0, progress))  # Clamp progress
+                        self.update_video(video_item,
+                                          progress=progress,
+                                          progress_mode="determinate",
+                                          speed=speed,
+                                          eta=eta)
+                    else:
+                        # Indeterminate mode - unknown total size
+                        self.update_video(video_item,
+                                          progress_mode="indeterminate",
+                                          speed=speed,
+                                          eta=eta)
+
+                elif d['status'] == 'finished':
+                    received.reset()  # next file (e.g. audio after video) starts over
+                    info_dict = d.get('info_dict') or {}
+                    if info_dict.get('extractor_key') and info_dict.get('id'):
+                        finished['key'] = archive_key(info_dict['extractor_key'], info_dict['id'])
+                    video_item.filename = os.path.basename(d['filename'])
+                    self.update_video(video_item, status="completed", progress=100)
+                    # Start next pending downloads
+                    try:
+                        self.refill()
+                    except Exception:
+                        pass
+
+            ydl_opts = self.build_ydl_opts(video_item, progress_hook, fragments)
+
+            with self.create_ydl(ydl_opts) as ydl:
+                info = self.take_info(video_item)
+                if info:
+                    # Already in the download folder (e.g. an earlier run) - keep it
+                    filename = self.expected_filename(ydl, info)
+                    if self.skip_downloaded and filename in self.file_index:
+                        video_item.filename = filename
+                        self.update_video(video_item, status="completed", progress=100)
+                        self.record_download(video_item, video_item.archive_key)
+                        return
+                    # Reuse the analyzed info - no second extraction
+                    ydl.process_ie_result(info, download=True)
+                else:
+                    ydl.download([video_item.url])
+
+            if video_item.status == "completed":
+                self.record_download(video_item, finished['key'])
+
+        except DownloadInterrupted:
+            pass  # status was already set by pause/cancel; cleanup below
+
+        except yt_dlp.DownloadError as e:
+            if self.interrupted(video_item, generation):
+                return  # yt-dlp wrapped our DownloadInterrupted
+            error_msg = str(e)
+            detailed_traceback = traceback.format_exc()
+
+            # Throttling responses tell the auto tuner to back off
+            if "429" in error_msg or "503" in error_msg:
+                self.autotune.record_throttle()
+
+            # Check if this is a retryable error
+            retryable_errors = ["timeout", "network", "connection", "429", "503", "timed out"]
+            is_retryable = any(err in error_msg.lower() for err in retryable_errors)
+
+            if is_retryable and video_item.retry_count < video_item.max_retries:
+                # Retry with exponential backoff
+                video_item.retry_count += 1
+                retry_delay = 3 * (2 ** (video_item.retry_count - 1))  # 3s, 6s, 12s
+
+                video_item.error_message = f"Retrying... (attempt {video_item.retry_count}/{video_item.max_retries})"
+                self.update_video(video_item, status="retrying")
+                self.error_logger.log_event('download_retry', video_item, error=error_msg,
+                                            delay=retry_delay, elapsed=round(time.monotonic() - started, 3))
+
+                # Schedule retry without holding a worker
+                self.executor.submit_later(retry_delay, self.resume_after_backoff, video_item.id)
+                return
+
+            # Categorize errors for better user understanding
+            if "ffmpeg" in error_msg.lower() or "postprocessor" in error_msg.lower():
+                video_item.error_message = "FFmpeg required - Please install FFmpeg or try different quality"
+            elif "HTTP Error 403" in error_msg:
+                video_item.error_message = "Access denied - Video may be private or region-blocked"
+            elif "HTTP Error 404" in error_msg:
+                video_item.error_message = "Video not found - May have been deleted"
+            elif "HTTP Error 429" in error_msg:
+                video_item.error_message = "Rate limited - Too many requests, try again later"
+            elif "Sign in to confirm your age" in error_msg:
+                video_item.error_message = "Age-restricted content - Cannot download"
+            elif "Private video" in error_msg:
+                video_item.error_message = "Private video - Access denied"
+            elif "Video unavailable" in error_msg:
+                video_item.error_message = "Video unavailable - May be deleted or restricted"
+            elif "tiktok" in video_item.url.lower():
+                video_item.error_message = "TikTok download failed - Platform restrictions"
+            else:
+                video_item.error_message = f"Download failed: {error_msg[:100]}"
+
+            # Add retry info if retries were attempted
+            if video_item.retry_count > 0:
+                video_item.error_message += f" (after {video_item.retry_count} retries)"
+
+            # Log detailed error
+            self.error_logger.log_download_error(video_item, error_msg, detailed_traceback,
+                                                 error=e, elapsed=time.monotonic() - started)
+
+            self.update_video(video_item, status="error")
+
+        except Exception as e:
+            if self.interrupted(video_item, generation):
+                return
+            error_msg = f"Unexpected error: {str(e)}"
+            video_item.error_message = error_msg[:100]
+            detailed_traceback = traceback.format_exc()
+
+            # Log detailed error
+            try:
+                self.error_logger.log_download_error(video_item, error_msg, detailed_traceback,
+                                                     error=e, elapsed=time.monotonic() - started)
+            except Exception:
+                pass
+
+            self.update_video(video_item, status="error")
+            self.emit('unexpected_error', video_item, error=error_msg)
+        finally:
+            self.fragments.release(fragments)
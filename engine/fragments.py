@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fragment connection budget - caps concurrent HLS/DASH fragment downloads
+across all active downloads
+"""
+
+import threading
+
+
+class FragmentBudget:
+    """Pool of fragment connections leased to downloads.
+
+    Each download leases its fair share (total / download slots) when it
+    starts and returns it when it ends, so a few fragmented streams can
+    fill the link while the sum over all downloads stays within the
+    budget. Every download gets at least one connection.
+    """
+
+    def __init__(self, total):
+        self._lock = threading.Lock()
+        self._total = max(1, int(total))
+        self._leased = 0
+
+    @property
+    def total(self):
+        return self._total
+
+    @property
+    def leased(self):
+        return self._leased
+
+    def set_total(self, total):
+        """Change the budget; running downloads keep their lease"""
+        with self._lock:
+            self._total = max(1, int(total))
+
+    def acquire(self, slots):
+        """Lease connections for one download out of `slots` running at most"""
+        with self._lock:
+            share = max(1, self._total // max(1, slots))
+            lease = max(1, min(share, self._total - self._leased))
+            self._leased += lease
+            return lease
+
+    def release(self, lease):
+        with self._lock:
+            self._leased = max(0, self._leased - lease)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Error logging for download failures - records are queued and written by
+a background thread, to a readable log and a JSON-lines event log, both
+rotated by size and age and gzip-compressed
+"""
+
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import socket
+import time
+from datetime import datetime
+
+from config import LOG_MAX_MB, LOG_BACKUP_COUNT, LOG_ROTATE_DAYS
+
+from .urls import platform_of
+
+
+class CompressedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotates when the file exceeds maxBytes or is older than `interval`
+    seconds; rotated files are gzipped (name.1.gz, name.2.gz, ...)"""
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, interval=0, encoding=None):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding)
+        self.interval = interval
+        self.namer = lambda name: name + '.gz'
+        self.rotator = self._compress
+        # Start time of the current file. Linux has no portable creation
+        # time (st_ctime changes on every write), so it is kept in a sidecar
+        self.started_file = self.baseFilename + '.started'
+        self.rollover_at = self._started() + interval if interval else float('inf')
+
+    def _started(self):
+        """When the current log file was started, across restarts"""
+        try:
+            if os.path.getsize(self.baseFilename) > 0:
+                with open(self.started_file, encoding='utf-8') as f:
+                    return float(f.read().strip())
+        except (OSError, ValueError):
+            pass
+        return self._mark_started()
+
+    def _mark_started(self):
+        now = time.time()
+        try:
+            with open(self.started_file, 'w', encoding='utf-8') as f:
+                f.write(str(now))
+        except OSError:
+            pass
+        return now
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+    def shouldRollover(self, record):
+        if time.time() >= self.rollover_at and os.path.exists(self.baseFilename) \
+                and os.path.getsize(self.baseFilename) > 0:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        started = self._mark_started()
+        self.rollover_at = started + self.interval if self.interval else float('inf')
+
+
+class JSONLineFormatter(logging.Formatter):
+    """One JSON object per line, from the record's `event` dict"""
+
+    def format(self, record):
+        return json.dumps(getattr(record, 'event', {'message': record.getMessage()}),
+                          ensure_ascii=False, default=str)
+
+
+class ErrorLogger:
+    """Enhanced error logging system for download failures.
+
+    Callers only put records on a queue; a QueueListener thread formats
+    and writes them, so a slow disk never blocks a download worker.
+    czdownloader_errors.log is for people, czdownloader_events.jsonl has
+    one record per event with stable fields (event, id, url, platform,
+    error_class, retry_count, elapsed, host, ...) for grep/aggregation.
+    """
+
+    def __init__(self, download_path):
+        self.download_path = download_path
+        self.log_file = os.path.join(download_path, "czdownloader_errors.log")
+        self.events_file = os.path.join(download_path, "czdownloader_events.jsonl")
+        self.host = socket.gethostname()
+        self.listener = None
+        self.setup_logger()
+
+    def setup_logger(self):
+        """Setup queue-backed, rotating file loggers"""
+        self.logger = logging.getLogger("CZDownloader")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.events = logging.getLogger("CZDownloader.events")
+        self.events.setLevel(logging.INFO)
+        self.events.propagate = False
+
+        # Clear existing handlers
+        self.logger.handlers.clear()
+        self.events.handlers.clear()
+
+        rotation = {'maxBytes': LOG_MAX_MB * 1024 * 1024, 'backupCount': LOG_BACKUP_COUNT,
+                    'interval': LOG_ROTATE_DAYS * 24 * 3600, 'encoding': 'utf-8'}
+
+        # Readable log with detailed info
+        file_handler = CompressedRotatingFileHandler(self.log_file, **rotation)
+        file_handler.setFormatter(logging.Formatter(
+            '%(asctime)s | %(levelname)s | %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        file_handler.addFilter(lambda record: not hasattr(record, 'event'))
+
+        # Structured log, one JSON object per line
+        events_handler = CompressedRotatingFileHandler(self.events_file, **rotation)
+        events_handler.setFormatter(JSONLineFormatter())
+        events_handler.addFilter(lambda record: hasattr(record, 'event'))
+
+        # Both loggers only enqueue; the listener thread does the writing
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        self.logger.addHandler(queue_handler)
+        self.events.addHandler(queue_handler)
+        self.listener = logging.handlers.QueueListener(log_queue, file_handler, events_handler,
+                                                       respect_handler_level=True)
+        self.listener.start()
+
+    def log_event(self, event, video_item=None, **fields):
+        """Write one structured record (JSON line)"""
+        record = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'event': event,
+                  'host': self.host}
+        if video_item is not None:
+            url = getattr(video_item, 'url', '')
+            added_time = getattr(video_item, 'added_time', None)
+            record.update({
+                'id': getattr(video_item, 'id', None),
+                'url': url,
+                'platform': platform_of(url),
+                'title': getattr(video_item, 'title', None),
+                'quality': getattr(video_item, 'quality', None),
+                'retry_count': getattr(video_item, 'retry_count', 0),
+                'added_time': added_time.isoformat() if added_time else None,
+                'age': round((datetime.now() - added_time).total_seconds(), 3) if added_time else None,
+            })
+        record.update(fields)
+        self.events.info(event, extra={'event': record})
+
+    def log_download_error(self, video_item, error_msg, detailed_traceback=None,
+                           error=None, elapsed=None):
+        """Log detailed download error (error is the exception, elapsed the
+        seconds the download ran)"""
+        try:
+            error_class = type(error).__name__ if error is not None else None
+            # yt-dlp wraps the real failure (HTTPError, timeout, ...)
+            exc_info = getattr(error, 'exc_info', None)
+            if exc_info and exc_info[0] is not None:
+                error_class = exc_info[0].__name__
+
+            self.log_event('download_error', video_item, error_class=error_class,
+                           error=str(error_msg), elapsed=round(elapsed, 3) if elapsed else None)
+
+            log_msg = (f"Download failed: {getattr(video_item, 'title', 'Unknown')} | "
+                       f"{getattr(video_item, 'url', 'Unknown')} | "
+                       f"quality={getattr(video_item, 'quality', 'Unknown')} | "
+                       f"id={getattr(video_item, 'id', 'Unknown')} | {error_msg}")
+            if detailed_traceback:
+                log_msg += f"\n{detailed_traceback.rstrip()}"
+            self.logger.error(log_msg)
+
+        except Exception as e:
+            print(f"Failed to log error: {e}")
+
+    def log_batch_summary(self, batch_summary):
+        """Log batch download summary"""
+        try:
+            total = batch_summary.get('total', 0)
+            completed = batch_summary.get('completed', 0)
+            failed = batch_summary.get('failed', 0)
+            start_time = batch_summary.get('start_time')
+            duration = (datetime.now() - start_time).total_seconds() if start_time else None
+
+            self.log_event('batch_summary', batch_id=batch_summary.get('batch_id'), total=total,
+                           completed=completed, failed=failed,
+                           cancelled=batch_summary.get('cancelled', 0),
+                           elapsed=round(duration, 3) if duration is not None else None)
+
+            duration_str = str(datetime.now() - start_time).split('.')[0] if start_time else "Unknown"
+            self.logger.info(
+                f"Batch #{batch_summary.get('batch_id', '')} finished: {completed}/{total} completed, "
+                f"{failed} failed, success rate {(completed/total*100) if total > 0 else 0:.1f}%, "
+                f"duration {duration_str}")
+
+        except Exception as e:
+            print(f"Failed to log batch summary: {e}")
+
+    def get_log_file_path(self):
+        """Get the log file path"""
+        return self.log_file
+
+    def close(self):
+        """Write out queued records and stop the writer thread"""
+        if self.listener:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Queue data model shared by the engine and the GUI
+"""
+
+import uuid
+from datetime import datetime
+
+
+class VideoItem:
+    """Represents a video in the download queue"""
+
+    _defaults = None  # attribute defaults, used by from_fields()
+
+    def __init__(self, url, quality="best"):
+        self.id = str(uuid.uuid4())
+        self.url = url
+        self.quality = quality
+        self.status = "pending"  # pending, analyzing, downloading, retrying, paused, completed, error, cancelled
+        self.title = "Loading..."
+        self.duration = 0
+        self.uploader = ""
+        self.thumbnail_url = ""
+        self.formats = []  # available formats from analysis (no stream URLs)
+        self.info = None  # compact analyzed info dict, reused to download without re-extracting
+        self.info_expires = 0  # epoch seconds after which info's media URLs are stale
+        self.archive_key = ""  # 'extractor id' from analysis, see engine.archive
+        self.flat = False  # metadata from a flat playlist entry, full analysis deferred
+        self.dedupe_key = ""  # see engine.urls.item_key; computed once, persisted
+        self.platform = ""  # see engine.urls.item_platform; computed once, persisted
+        self.file_size = 0
+        self.downloaded_size = 0
+        self.speed = 0
+        self.eta = 0
+        self.progress = 0
+        self.progress_mode = "determinate"  # determinate, indeterminate
+        self.error_message = ""
+        self.filename = ""
+        self.added_time = datetime.now()
+        self.retry_count = 0
+        self.max_retries = 3
+        self.cancel_flag = False
+        self.pause_requested = False  # checked by the download progress hook
+        self.generation = 0  # bumped by pause/cancel; workers of an older generation stop
+        self.running = False  # a download worker still owns the item (no re-dispatch)
+        self.partial_files = set()  # temp files seen while downloading (removed on cancel)
+        self.extract_audio = False  # New: audio-only extraction
+
+    @classmethod
+    def from_fields(cls, fields):
+        """Rebuild a stored item (keeps its id; skips uuid/clock calls, so
+        restoring large queues stays fast). Missing fields get defaults."""
+        if cls._defaults is None:
+            cls._defaults = vars(cls(""))
+        video_item = cls.__new__(cls)
+        video_item.__dict__.update(cls._defaults)
+        video_item.formats = []
+        video_item.partial_files = set()
+        video_item.__dict__.update(fields)
+        return video_item
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'url': self.url,
+            'quality': self.quality,
+            'status': self.status,
+            'title': self.title,
+            'duration': self.duration,
+            'uploader': self.uploader,
+            'progress': self.progress,
+            'filename': self.filename,
+            'added_time': self.added_time.isoformat()
+        }
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Crash-safe queue persistence - every VideoItem change is written to an
+SQLite database in WAL mode by a single background writer thread
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from .models import VideoItem
+
+# VideoItem attributes stored per row (besides id and position)
+COLUMNS = ('url', 'quality', 'status', 'title', 'duration', 'uploader', 'thumbnail_url',
+           'file_size', 'downloaded_size', 'progress', 'progress_mode', 'error_message',
+           'filename', 'added_time', 'retry_count', 'max_retries', 'extract_audio', 'dedupe_key',
+           'platform', 'archive_key', 'flat')
+
+# Statuses that cannot survive a restart (their worker is gone)
+INTERRUPTED_STATUSES = ('analyzing', 'downloading', 'retrying')
+
+
+class QueueDatabase:
+    """Persistent mirror of the engine queue.
+
+    Callers only mark items dirty; the writer thread snapshots them and
+    commits in one transaction every `flush_interval` seconds (progress
+    ticks), or right away for status changes, adds and removals.
+    """
+
+    def __init__(self, path, flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._cond = threading.Condition()  # guards pending changes
+        self._db_lock = threading.Lock()  # guards the connection
+        self._dirty = {}  # video_id -> VideoItem
+        self._deleted = set()
+        self._cleared = False
+        self._urgent = False
+        self._closed = False
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # WAL: safe against app crashes
+        self._db.execute(f"""
+            CREATE TABLE IF NOT EXISTS videos (
+                id TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                {', '.join(COLUMNS)}
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS videos_position ON videos (position)")
+        # Databases from older versions lack the newer columns (NULL until rewritten)
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(videos)")}
+        for name in COLUMNS:
+            if name not in existing:
+                self._db.execute(f"ALTER TABLE videos ADD COLUMN {name}")
+        self._db.commit()
+        self._next_position = self._db.execute(
+            "SELECT COALESCE(MAX(position), 0) + 1 FROM videos").fetchone()[0]
+        self._positions = {}  # video_id -> position, for items seen this session
+
+        self._writer = threading.Thread(target=self._writer_loop, name="queue-db-writer")
+        self._writer.daemon = True
+        self._writer.start()
+
+    # Recording ----------------------------------------------------------
+
+    def record(self, video_item, urgent=False):
+        """Persist the item's current state soon (immediately if urgent)"""
+        with self._cond:
+            if video_item.id not in self._positions:
+                self._positions[video_item.id] = self._next_position
+                self._next_position += 1
+                urgent = True
+            self._deleted.discard(video_item.id)
+            self._dirty[video_item.id] = video_item
+            if urgent:
+                self._urgent = True
+                self._cond.notify()
+
+    def delete(self, video_id):
+        with self._cond:
+            self._dirty.pop(video_id, None)
+            self._positions.pop(video_id, None)
+            self._deleted.add(video_id)
+            self._urgent = True
+            self._cond.notify()
+
+    def clear(self):
+        with self._cond:
+            self._dirty.clear()
+            self._deleted.clear()
+            self._positions.clear()
+            self._cleared = True
+            self._urgent = True
+            self._cond.notify()
+
+    # Restore ------------------------------------------------------------
+
+    def load(self, page_size=2000):
+        """Yield lists of VideoItems from the database in queue order.
+
+        Rows are read and rebuilt one page at a time, so the first items
+        are available right away even for very large queues. Interrupted
+        items come back as pending (downloads resume from their .part files).
+        """
+        names = ('id', 'position') + COLUMNS
+        with self._db_lock:
+            cursor = self._db.execute(
+                f"SELECT id, position, {', '.join(COLUMNS)} FROM videos ORDER BY position")
+            rows = cursor.fetchmany(page_size)
+        while rows:
+            video_items = []
+            with self._cond:
+                for row in rows:
+                    video_item = VideoItem.from_fields(zip(names, row))
+                    self._positions[video_item.id] = video_item.__dict__.pop('position')
+                    video_item.added_time = datetime.fromisoformat(video_item.added_time)
+                    video_item.extract_audio = bool(video_item.extract_audio)
+                    video_item.flat = bool(video_item.flat)
+                    video_item.archive_key = video_item.archive_key or ""
+                    if video_item.status in INTERRUPTED_STATUSES:
+                        video_item.status = "pending"
+                    video_items.append(video_item)
+            yield video_items
+            with self._db_lock:
+                rows = cursor.fetchmany(page_size)
+
+    # Writer -------------------------------------------------------------
+
+    def flush(self):
+        """Write pending changes now (blocks until committed)"""
+        with self._cond:
+            pending = self._take_pending()
+        self._write(*pending)
+
+    def close(self):
+        """Flush and stop the writer"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._writer.join(timeout=5)
+        self.flush()
+        with self._db_lock:
+            self._db.close()
+
+    def _writer_loop(self):
+        while True:
+            with self._cond:
+                if not self._urgent and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+                pending = self._take_pending()
+            try:
+                self._write(*pending)
+            except sqlite3.Error as e:
+                print(f"⚠️ Queue database write failed: {e}")
+            if closed:
+                return
+
+    def _take_pending(self):
+        """Swap out pending changes (caller holds _cond)"""
+        pending = (self._cleared, self._deleted, self._dirty,
+                   {video_id: self._positions[video_id] for video_id in self._dirty})
+        self._dirty = {}
+        self._deleted = set()
+        self._cleared = False
+        self._urgent = False
+        return pending
+
+    def _write(self, cleared, deleted, dirty, positions):
+        """Commit one batch of changes in a single transaction"""
+        if not (cleared or deleted or dirty):
+            return
+
+        rows = []
+        for video_id, video_item in dirty.items():
+            values = [getattr(video_item, name) for name in COLUMNS]
+            values[COLUMNS.index('added_time')] = video_item.added_time.isoformat()
+            rows.append((video_id, positions[video_id], *values))
+
+        with self._db_lock, self._db:
+            if cleared:
+                self._db.execute("DELETE FROM videos")
+            if deleted:
+                self._db.executemany("DELETE FROM videos WHERE id = ?",
+                                     [(video_id,) for video_id in deleted])
+            if rows:
+                updates = ', '.join(f"{name} = excluded.{name}" for name in COLUMNS)
+                self._db.executemany(
+                    f"INSERT INTO videos (id, position, {', '.join(COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * (len(COLUMNS) + 2))}) "
+                    f"ON CONFLICT(id) DO UPDATE SET {updates}", rows)
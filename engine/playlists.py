@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Background playlist/channel expansion - entries are queued page by page
+while the rest of the listing is still being fetched
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class PlaylistExpansion:
+    """Handle for one background expansion (see DownloadEngine.expand_in_background).
+
+    `found` counts entries read from the listing, `added` those queued
+    (duplicates are skipped). cancel() stops after the page being fetched;
+    `future` resolves to stats() when the expansion ends. For subscription
+    syncs (`sync`), `keys` collects the new entries' keys, newest first.
+    """
+
+    def __init__(self, url, sync=False):
+        self.url = url
+        self.sync = sync
+        self.found = 0
+        self.added = 0
+        self.keys = []
+        self.error = None
+        self.batch = None  # Batch the entries join when started right away
+        self.future = Future()
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def stats(self):
+        return {
+            'url': self.url,
+            'sync': self.sync,
+            'found': self.found,
+            'added': self.added,
+            'done': self.done,
+            'cancelled': self.cancelled,
+            'error': str(self.error) if self.error else None,
+        }
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Native segmented downloader - fetches large progressive (single URL)
+files as parallel byte ranges (unless the aria2c daemon is used)
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+
+try:
+    import yt_dlp
+    from yt_dlp.downloader.common import FileDownloader
+    from yt_dlp.networking import Request
+except ImportError:
+    yt_dlp = None
+    FileDownloader = object
+    Request = None
+
+CONTENT_RANGE = re.compile(r'bytes\s+\d+-\d+/(\d+)')
+
+
+class SegmentedFD(FileDownloader):
+    """yt-dlp file downloader that splits a file into byte ranges.
+
+    `connections` threads pull ranges from a shared queue and write them
+    into a preallocated .part file; failed ranges go back on the queue
+    (up to `retries` times each). Finished ranges are recorded next to
+    the .part file, so a paused download resumes where it stopped.
+    Progress goes through the normal progress-hook contract, and
+    transfers wait while a hook is running, so a hook that sleeps
+    (bandwidth limit) or raises (pause/cancel) controls every connection.
+    """
+
+    BLOCK_SIZE = 64 * 1024
+    REPORT_INTERVAL = 0.25  # seconds between progress hooks
+
+    def __init__(self, ydl, params, connections=8, segment_size=4 * 1024 * 1024):
+        super().__init__(ydl, params)
+        self.connections = connections
+        self.segment_size = segment_size
+
+    @staticmethod
+    def supports(info):
+        """Plain HTTP(S), not live, no POST data"""
+        return (info.get('protocol') in ('http', 'https')
+                and not info.get('is_live')
+                and not info.get('request_data')
+                and not (info.get('url') or '').startswith('data:'))
+
+    @staticmethod
+    def probe(ydl, info):
+        """Total size if the server honours Range requests, else None"""
+        headers = dict(info.get('http_headers') or {}, **{'Range': 'bytes=0-0', 'Accept-Encoding': 'identity'})
+        try:
+            response = ydl.urlopen(Request(info['url'], headers=headers))
+            try:
+                match = CONTENT_RANGE.match(response.headers.get('Content-Range') or '')
+                if response.status == 206 and match:
+                    return int(match.group(1))
+            finally:
+                response.close()
+        except Exception:
+            pass
+        return None
+
+    def real_download(self, filename, info_dict):
+        total = info_dict['filesize']
+        tmpfilename = self.temp_name(filename)
+        state_file = tmpfilename + '.segments'
+        self.report_destination(filename)
+
+        # Resume: reuse the .part file if it matches the recorded size
+        done = set()
+        if os.path.exists(tmpfilename) and os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('size') == total and os.path.getsize(tmpfilename) == total:
+                    done = {tuple(r) for r in state.get('done', [])}
+            except (OSError, ValueError):
+                done = set()
+        if not done:
+            with open(tmpfilename, 'wb') as f:
+                f.truncate(total)  # preallocate
+
+        segments = queue.Queue()
+        for start in range(0, total, self.segment_size):
+            segment = (start, min(start + self.segment_size, total) - 1)
+            if segment not in done:
+                segments.put(segment)
+
+        resumed = sum(end - start + 1 for start, end in done)
+        progress = {'bytes': resumed, 'error': None}
+        lock = threading.Lock()
+        stop = threading.Event()
+        gate = threading.Event()  # cleared while a progress hook runs
+        gate.set()
+        retries = self.params.get('fragment_retries', 3)
+        failures = {}
+        headers = dict(info_dict.get('http_headers') or {}, **{'Accept-Encoding': 'identity'})
+
+        def fetch(segment, f):
+            start, end = segment
+            request = Request(info_dict['url'], headers=dict(headers, Range=f'bytes={start}-{end}'))
+            response = self.ydl.urlopen(request)
+            received = 0
+            try:
+                if response.status != 206:
+                    raise OSError(f'server ignored Range (HTTP {response.status})')
+                f.seek(start)
+                while received < end - start + 1:
+                    gate.wait()
+                    if stop.is_set():
+                        raise InterruptedError
+                    block = response.read(min(self.BLOCK_SIZE, end - start + 1 - received))
+                    if not block:
+                        raise OSError(f'connection closed at byte {start + received}')
+                    f.write(block)
+                    received += len(block)
+                    with lock:
+                        progress['bytes'] += len(block)
+            except BaseException:
+                with lock:
+                    progress['bytes'] -= received  # the range will be fetched again
+                raise
+            finally:
+                response.close()
+
+        def worker():
+            with open(tmpfilename, 'r+b') as f:
+                while not stop.is_set():
+                    try:
+                        segment = segments.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        fetch(segment, f)
+                    except InterruptedError:
+                        segments.put(segment)
+                        return
+                    except Exception as e:
+                        # Reassign the range; give up after too many failures
+                        with lock:
+                            failures[segment] = failures.get(segment, 0) + 1
+                            if failures[segment] > retries:
+                                progress['error'] = e
+                                stop.set()
+                                return
+                        segments.put(segment)
+                        continue
+                    f.flush()
+                    with lock:
+                        done.add(segment)
+                        save_state()
+
+        def save_state():
+            with open(state_file, 'w', encoding='utf-8') as f:
+                json.dump({'size': total, 'done': sorted(done)}, f)
+
+        threads = [threading.Thread(target=worker, name=f'segment-{i}', daemon=True)
+                   for i in range(min(self.connections, segments.qsize()))]
+        start_time = time.time()
+        for thread in threads:
+            thread.start()
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(self.REPORT_INTERVAL)
+                downloaded = progress['bytes']
+                now = time.time()
+                speed = self.calc_speed(start_time, now, downloaded - resumed)
+                gate.clear()
+                try:
+                    self._hook_progress({
+                        'status': 'downloading',
+                        'downloaded_bytes': downloaded,
+                        'total_bytes': total,
+                        'tmpfilename': tmpfilename,
+                        'filename': filename,
+                        'elapsed': now - start_time,
+                        'speed': speed,
+                        'eta': self.calc_eta(speed, total - downloaded) if speed else None,
+                    }, info_dict)
+                finally:
+                    gate.set()
+        except BaseException:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            raise
+
+        if progress['error'] is not None or not segments.empty():
+            raise yt_dlp.utils.DownloadError(f'Segmented download failed: {progress["error"]}')
+
+        if os.path.exists(state_file):
+            os.remove(state_file)
+        self.try_rename(tmpfilename, filename)
+        self._hook_progress({
+            'status': 'finished',
+            'downloaded_bytes': total,
+            'total_bytes': total,
+            'filename': filename,
+            'elapsed': time.time() - start_time,
+        }, info_dict)
+        return True
+
+
+class SegmentedYoutubeDL(yt_dlp.YoutubeDL if yt_dlp else object):
+    """YoutubeDL that routes large progressive files through SegmentedFD"""
+
+    def __init__(self, params=None, connections=8, min_size=10 * 1024 * 1024,
+                 segment_size=4 * 1024 * 1024):
+        super().__init__(params)
+        self.connections = connections
+        self.min_size = min_size
+        self.segment_size = segment_size
+
+    def dl(self, name, info, subtitle=False, test=False):
+        if test or subtitle or name == '-' or self.connections < 2 or not SegmentedFD.supports(info):
+            return super().dl(name, info, subtitle, test)
+
+        new_info = self._copy_infodict(info)
+        if new_info.get('http_headers') is None:
+            new_info['http_headers'] = self._calc_headers(new_info)
+        total = SegmentedFD.probe(self, new_info)
+        if not total or total < self.min_size:
+            return super().dl(name, info, subtitle, test)
+
+        new_info['filesize'] = total
+        fd = SegmentedFD(self, self.params, self.connections, self.segment_size)
+        for ph in self._progress_hooks:
+            fd.add_progress_hook(ph)
+        self.write_debug(f'Invoking segmented downloader ({self.connections} connections) on "{info["url"]}"')
+        return fd.download(name, new_info, subtitle)
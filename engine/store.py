@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Status-indexed queue store - O(1) "next pending", per-status counts
+and "anything still active" checks instead of full queue scans
+"""
+
+import threading
+
+# Statuses that keep a batch running
+ACTIVE_STATUSES = ('pending', 'analyzing', 'downloading', 'retrying')
+
+
+class QueueStore:
+    """Dict-like video queue (video_id -> VideoItem) indexed by status.
+
+    Each status bucket is an insertion-ordered dict, so the "pending"
+    bucket is a FIFO: items are served in the order they became pending.
+    With group_of (e.g. platform_of on the URL) every status bucket is
+    also split per group, so "oldest pending YouTube video" is O(1) too.
+    With key_of (e.g. dedupe_key on the URL) items are also indexed by
+    key, and unique adds reject an item whose key is already queued.
+    Status changes must go through set_status() to keep the index valid.
+    """
+
+    def __init__(self, group_of=None, key_of=None):
+        self._items = {}  # video_id -> VideoItem (queue order)
+        self._by_status = {}  # status -> {video_id: VideoItem}
+        self._group_of = group_of  # group_of(video_item) -> hashable key
+        self._groups = {}  # video_id -> group
+        self._by_group = {}  # (status, group) -> {video_id: VideoItem}
+        self._key_of = key_of  # key_of(video_item) -> hashable key
+        self._keys = {}  # key -> video_id
+        self._item_keys = {}  # video_id -> key
+        self._lock = threading.RLock()
+
+    # Dict-like access -------------------------------------------------
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, video_id):
+        return video_id in self._items
+
+    def __getitem__(self, video_id):
+        return self._items[video_id]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def get(self, video_id, default=None):
+        return self._items.get(video_id, default)
+
+    def values(self):
+        """Snapshot of all items in queue order"""
+        with self._lock:
+            return list(self._items.values())
+
+    # Mutation ---------------------------------------------------------
+
+    def add(self, video_item, unique=False):
+        """Insert an item, indexed under its current status. With unique,
+        an item whose key is already queued is rejected; returns False."""
+        with self._lock:
+            return self._insert(video_item, unique)
+
+    def add_many(self, video_items, unique=False):
+        """Insert several items under one lock acquisition; returns the
+        inserted ones (with unique, duplicates - also within video_items -
+        are left out)"""
+        with self._lock:
+            return [video_item for video_item in video_items if self._insert(video_item, unique)]
+
+    def _insert(self, video_item, unique=False):
+        if self._key_of:
+            key = self._key_of(video_item)
+            if unique and key in self._keys:
+                return False
+            self._keys[key] = video_item.id
+            self._item_keys[video_item.id] = key
+        self._items[video_item.id] = video_item
+        self._by_status.setdefault(video_item.status, {})[video_item.id] = video_item
+        if self._group_of:
+            group = self._groups[video_item.id] = self._group_of(video_item)
+            self._by_group.setdefault((video_item.status, group), {})[video_item.id] = video_item
+        return True
+
+    def pop(self, video_id, default=None):
+        """Remove and return an item"""
+        with self._lock:
+            video_item = self._items.pop(video_id, None)
+            if video_item is None:
+                return default
+            self._by_status.get(video_item.status, {}).pop(video_id, None)
+            if self._group_of:
+                group = self._groups.pop(video_id)
+                self._by_group.get((video_item.status, group), {}).pop(video_id, None)
+            if self._key_of:
+                key = self._item_keys.pop(video_id)
+                if self._keys.get(key) == video_id:
+                    del self._keys[key]
+            return video_item
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._by_status.clear()
+            self._groups.clear()
+            self._by_group.clear()
+            self._keys.clear()
+            self._item_keys.clear()
+
+    def set_status(self, video_item, status):
+        """Move an item to another status bucket (appends to its FIFO)"""
+        with self._lock:
+            old = video_item.status
+            if video_item.id in self._items:
+                self._by_status.get(old, {}).pop(video_item.id, None)
+                self._by_status.setdefault(status, {})[video_item.id] = video_item
+                if self._group_of:
+                    group = self._groups[video_item.id]
+                    self._by_group.get((old, group), {}).pop(video_item.id, None)
+                    self._by_group.setdefault((status, group), {})[video_item.id] = video_item
+            video_item.status = status
+
+    # Queries ----------------------------------------------------------
+
+    def count(self, status):
+        """Number of items with the given status"""
+        return len(self._by_status.get(status, ()))
+
+    def items(self, status):
+        """Snapshot of items with the given status, oldest first"""
+        with self._lock:
+            return list(self._by_status.get(status, {}).values())
+
+    def first(self, status, group=None):
+        """Oldest item with the given status (within group, if given), or None"""
+        with self._lock:
+            if group is None:
+                bucket = self._by_status.get(status)
+            else:
+                bucket = self._by_group.get((status, group))
+            if not bucket:
+                return None
+            return next(iter(bucket.values()))
+
+    def find(self, key):
+        """Queued item with the given key (see key_of), or None"""
+        with self._lock:
+            video_id = self._keys.get(key)
+            return self._items.get(video_id) if video_id else None
+
+    def group_of(self, video_id):
+        """Group key of an item (None without group_of)"""
+        return self._groups.get(video_id)
+
+    def groups(self, status):
+        """Groups that have items with the given status"""
+        with self._lock:
+            return [group for (bucket_status, group), bucket in self._by_group.items()
+                    if bucket_status == status and bucket]
+
+    def any_active(self):
+        """True while any item is pending, analyzing, downloading or retrying"""
+        return any(self.count(status) for status in ACTIVE_STATUSES)
+
+    def counts(self):
+        """Per-status counts"""
+        with self._lock:
+            return {status: len(bucket) for status, bucket in self._by_status.items() if bucket}
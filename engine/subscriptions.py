@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Channel/playlist subscriptions - the newest entries seen per URL are kept
+as a cursor, so a sync only lists (and queues) what was added since
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+
+class SubscriptionStore:
+    """Persistent subscriptions with their cursors (SQLite, WAL).
+
+    A cursor is the list of entry keys (archive keys or URL dedupe keys)
+    seen at the top of the listing, newest first, capped at `cursor_size`.
+    """
+
+    def __init__(self, path, cursor_size=200):
+        self.path = path
+        self.cursor_size = cursor_size
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                url TEXT PRIMARY KEY,
+                quality TEXT,
+                cursor TEXT NOT NULL DEFAULT '[]',
+                last_sync TEXT
+            )""")
+        self._db.commit()
+
+    def add(self, url, quality=None):
+        """Subscribe to url (keeps the cursor if already subscribed)"""
+        with self._lock:
+            self._db.execute("INSERT INTO subscriptions (url, quality) VALUES (?, ?) "
+                             "ON CONFLICT(url) DO UPDATE SET quality = excluded.quality", (url, quality))
+            self._db.commit()
+
+    def remove(self, url):
+        with self._lock:
+            self._db.execute("DELETE FROM subscriptions WHERE url = ?", (url,))
+            self._db.commit()
+
+    def all(self):
+        """[{'url', 'quality', 'last_sync'}] in subscription order"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, quality, last_sync FROM subscriptions ORDER BY rowid").fetchall()
+        return [{'url': url, 'quality': quality, 'last_sync': last_sync}
+                for url, quality, last_sync in rows]
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM subscriptions WHERE url = ?",
+                                    (url,)).fetchone() is not None
+
+    def cursor(self, url):
+        """Entry keys seen on the last sync, newest first"""
+        with self._lock:
+            row = self._db.execute("SELECT cursor FROM subscriptions WHERE url = ?", (url,)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def advance(self, url, new_keys):
+        """Put the keys found by a sync (newest first) in front of the cursor"""
+        cursor = list(dict.fromkeys(list(new_keys) + self.cursor(url)))[:self.cursor_size]
+        with self._lock:
+            self._db.execute("UPDATE subscriptions SET cursor = ?, last_sync = ? WHERE url = ?",
+                             (json.dumps(cursor), datetime.now().isoformat(), url))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming queue import/export - NDJSON (one video per line) or plain
+URL lists, read and written in chunks so memory stays flat
+"""
+
+import json
+import os
+
+# Extensions written/read as plain URL lists (everything else is NDJSON)
+URL_LIST_EXTENSIONS = ('.txt', '.list')
+
+
+def is_url_list(file_path):
+    return os.path.splitext(file_path)[1].lower() in URL_LIST_EXTENSIONS
+
+
+def write_queue_file(file_path, video_items, chunk_size=1000):
+    """Write videos as NDJSON records (or bare URLs for .txt). Returns the count."""
+    url_list = is_url_list(file_path)
+    count = 0
+    with open(file_path, 'w', encoding='utf-8') as f:
+        chunk = []
+        for video_item in video_items:
+            if url_list:
+                chunk.append(video_item.url + '\n')
+            else:
+                chunk.append(json.dumps(video_item.to_dict(), ensure_ascii=False) + '\n')
+            if len(chunk) >= chunk_size:
+                f.writelines(chunk)
+                count += len(chunk)
+                chunk = []
+        f.writelines(chunk)
+        count += len(chunk)
+    return count
+
+
+def read_queue_file(file_path, chunk_size=1000):
+    """Yield lists of video records ({'url': ..., optional 'quality', 'title'}).
+
+    Accepts NDJSON, plain URL lists (blank lines and # comments skipped)
+    and the old single-document JSON export ({"videos": [...]}).
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        f.seek(0)
+        if first == '{' and not is_url_list(file_path):
+            # Old format starts with a pretty-printed document, NDJSON with a record
+            line = f.readline()
+            f.seek(0)
+            if line.strip() == '{':
+                yield from _chunks(json.load(f).get('videos', []), chunk_size)
+                return
+
+        chunk = []
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            chunk.append(json.loads(line) if line.startswith('{') else {'url': line})
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _chunks(records, chunk_size):
+    for start in range(0, len(records), chunk_size):
+        yield records[start:start + chunk_size]
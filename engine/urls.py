@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+URL helpers shared by the engine (cache keys, duplicate detection)
+"""
+
+import re
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from config import SUPPORTED_PLATFORMS
+
+# Query parameters that never change which video a URL points to
+TRACKING_PARAMS = ('si', 'feature', 'fbclid', 'igshid', 'is_from_webapp', 'sender_device')
+
+# (platform, host suffixes, path pattern with the video id, canonical URL template).
+# Query ids (YouTube/Facebook watch?v=) are handled in video_id().
+VIDEO_PATHS = (
+    ('YouTube', ('youtu.be',), re.compile(r'^/([\w-]{11})(?:/|$)'),
+     'https://www.youtube.com/watch?v={}'),
+    ('YouTube', ('youtube.com',), re.compile(r'^/(?:shorts|embed|live|v)/([\w-]{11})(?:/|$)'),
+     'https://www.youtube.com/watch?v={}'),
+    ('TikTok', ('tiktok.com',), re.compile(r'^/@[^/]*/video/(\d+)'),
+     'https://www.tiktok.com/@/video/{}'),
+    ('Instagram', ('instagram.com',), re.compile(r'^/(?:[\w.]+/)?(?:p|reel|reels|tv)/([\w-]+)'),
+     'https://www.instagram.com/p/{}/'),
+    ('Twitter/X', ('twitter.com', 'x.com'), re.compile(r'^/(?:[^/]+|i/web)/status/(\d+)'),
+     'https://twitter.com/i/web/status/{}'),
+    ('Facebook', ('facebook.com',), re.compile(r'^/(?:[^/]+/)?videos/(?:[^/]+/)?(\d+)'),
+     'https://www.facebook.com/watch/?v={}'),
+)
+QUERY_IDS = (
+    ('YouTube', ('youtube.com',), '/watch', 'v', re.compile(r'^[\w-]{11}$'),
+     'https://www.youtube.com/watch?v={}'),
+    ('Facebook', ('facebook.com',), '/watch', 'v', re.compile(r'^\d+$'),
+     'https://www.facebook.com/watch/?v={}'),
+)
+
+
+def normalize_url(url):
+    """Stable key for a URL: lowercase host without www./m., no fragment,
+    no tracking parameters, sorted query"""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').lower()
+    for prefix in ('www.', 'm.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    query = sorted((key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                   if key not in TRACKING_PARAMS and not key.startswith('utm_'))
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse(('https', host, path, '', urlencode(query), ''))
+
+
+def _host_matches(host, domains):
+    return any(host == domain or host.endswith('.' + domain) for domain in domains)
+
+
+def video_id(url):
+    """(platform, video id, canonical URL) when the URL names a single video
+    on a supported platform, else None. Short links (youtu.be), mobile
+    hosts, timestamps and tracking parameters all map to the same id."""
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').lower()
+    path = parsed.path.rstrip('/') or '/'
+
+    for platform, domains, pattern, template in VIDEO_PATHS:
+        if _host_matches(host, domains):
+            match = pattern.match(path)
+            if match:
+                return platform, match.group(1), template.format(match.group(1))
+
+    query = dict(parse_qsl(parsed.query))
+    for platform, domains, query_path, param, pattern, template in QUERY_IDS:
+        if _host_matches(host, domains) and path == query_path and pattern.match(query.get(param, '')):
+            return platform, query[param], template.format(query[param])
+    return None
+
+
+def canonical_url(url):
+    """Canonical watch URL for a single video, otherwise the URL as given
+    (playlists, channels and unrecognized links are left alone)"""
+    match = video_id(url)
+    return match[2] if match else url.strip()
+
+
+# YouTube channel pages (/@handle, /channel/ID, /c/name, /user/name and their tabs)
+CHANNEL_PATH = re.compile(r'^/(?:@[^/]+|channel/[^/]+|c/[^/]+|user/[^/]+)(?:/(?:videos|shorts|streams))?$')
+
+
+def is_playlist_url(url):
+    """True for playlist and channel URLs, which expand into many videos"""
+    if 'playlist' in url or 'list=' in url:
+        return True
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or '').lower()
+    return _host_matches(host, ('youtube.com',)) and bool(CHANNEL_PATH.match(parsed.path.rstrip('/')))
+
+
+def dedupe_key(url):
+    """Key under which a URL is a duplicate: 'platform:id' for known videos,
+    the normalized URL otherwise"""
+    match = video_id(url)
+    return f"{match[0]}:{match[1]}" if match else normalize_url(url)
+
+
+def item_key(video_item):
+    """Dedupe key of a queued item, computed on first use and kept on it"""
+    if not video_item.dedupe_key:
+        video_item.dedupe_key = dedupe_key(video_item.url)
+    return video_item.dedupe_key
+
+
+def item_platform(video_item):
+    """Platform of a queued item (platform_of its URL), computed on first use
+    and kept on it"""
+    if not video_item.platform:
+        video_item.platform = platform_of(video_item.url)
+    return video_item.platform
+
+
+def platform_of(url):
+    """Platform name from SUPPORTED_PLATFORMS for url, or 'Other'"""
+    host = (urlparse(url).hostname or '').lower()
+    for domain, name in SUPPORTED_PLATFORMS.items():
+        if host == domain or host.endswith('.' + domain):
+            return name
+    return 'Other'
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bounded worker pools used by the engine for downloads and analysis
+"""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class DownloadExecutor:
+    """Fixed-size, resizable worker pool with a dispatch queue.
+
+    Threads are created once and reused for every job. Delayed jobs
+    (e.g. retries with backoff) wait on a single scheduler thread instead
+    of one sleeping thread each.
+    """
+
+    _STOP = object()
+
+    def __init__(self, size, name="download", on_change=None):
+        self.name = name
+        self.on_change = on_change  # called with stats() when occupancy changes
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._busy = 0
+        self._size = 0
+        self._seq = itertools.count()
+
+        # Delayed jobs: heap of (due_time, seq, fn, args)
+        self._delayed = []
+        self._delayed_cond = threading.Condition()
+        self._scheduler = None
+
+        self.resize(size)
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def busy(self):
+        return self._busy
+
+    def free_slots(self):
+        """Number of workers that could pick up a job right now"""
+        with self._lock:
+            return max(0, self._size - self._busy - self._jobs.qsize())
+
+    def stats(self):
+        """Slot occupancy snapshot"""
+        with self._lock:
+            return {
+                'size': self._size,
+                'busy': self._busy,
+                'queued': self._jobs.qsize(),
+                'delayed': len(self._delayed),
+            }
+
+    def resize(self, size):
+        """Grow or shrink the pool; surplus workers exit after their current job"""
+        size = max(1, int(size))
+        with self._lock:
+            # Drop references to workers that already exited
+            self._workers = [w for w in self._workers if w.is_alive()]
+            delta = size - self._size
+            self._size = size
+            for _ in range(max(0, delta)):
+                worker = threading.Thread(target=self._worker_loop,
+                                          name=f"{self.name}-worker-{next(self._seq)}")
+                worker.daemon = True
+                self._workers.append(worker)
+                worker.start()
+        for _ in range(max(0, -delta)):
+            self._jobs.put(self._STOP)
+        self._notify()
+
+    def submit(self, fn, *args):
+        """Queue a job for the next free worker"""
+        self._jobs.put((fn, args))
+        self._notify()
+
+    def submit_later(self, delay, fn, *args):
+        """Queue a job after `delay` seconds without holding a worker"""
+        with self._delayed_cond:
+            heapq.heappush(self._delayed, (time.monotonic() + delay, next(self._seq), fn, args))
+            if self._scheduler is None:
+                self._scheduler = threading.Thread(target=self._scheduler_loop,
+                                                   name=f"{self.name}-scheduler")
+                self._scheduler.daemon = True
+                self._scheduler.start()
+            self._delayed_cond.notify()
+
+    def shutdown(self):
+        """Stop all workers once queued jobs are done"""
+        with self._lock:
+            count = self._size
+            self._size = 0
+        for _ in range(count):
+            self._jobs.put(self._STOP)
+
+    def _worker_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is self._STOP:
+                return
+            fn, args = job
+            with self._lock:
+                self._busy += 1
+            self._notify()
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"⚠️ {self.name} worker error: {e}")
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                self._notify()
+
+    def _scheduler_loop(self):
+        while True:
+            with self._delayed_cond:
+                while not self._delayed:
+                    self._delayed_cond.wait()
+                due, _, fn, args = self._delayed[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self._delayed_cond.wait(wait)
+                    continue
+                heapq.heappop(self._delayed)
+            fn(*args)
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change(self.stats())
+            except Exception as e:
+                print(f"⚠️ {self.name} stats listener error: {e}")
+
+
+class KeyedExecutor:
+    """Fixed-size worker pool with a concurrency cap per key (e.g. platform).
+
+    Jobs wait in one FIFO per key and keys are served round-robin, so a
+    long run of URLs from one site cannot starve the others, and no key
+    ever has more than its cap running at once.
+    """
+
+    def __init__(self, size, limits=None, default_limit=None, name="keyed", on_change=None):
+        self.name = name
+        self.on_change = on_change  # called with stats() when occupancy changes
+        self.limits = dict(limits or {})  # key -> max running jobs
+        self.default_limit = default_limit
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()  # key -> deque of (fn, args), in round-robin order
+        self._running = {}  # key -> running jobs
+        self._busy = 0
+        self._size = 0
+        self._threads = 0
+        self._seq = itertools.count()
+        self.resize(size)
+
+    @property
+    def size(self):
+        return self._size
+
+    def limit(self, key):
+        return self.limits.get(key, self.default_limit) or self._size
+
+    def stats(self):
+        """Occupancy snapshot, with per-key running/queued counts"""
+        with self._cond:
+            keys = set(self._pending) | {k for k, n in self._running.items() if n}
+            return {
+                'size': self._size,
+                'busy': self._busy,
+                'queued': sum(len(jobs) for jobs in self._pending.values()),
+                'keys': {key: {'running': self._running.get(key, 0),
+                               'queued': len(self._pending.get(key, ()))}
+                         for key in keys},
+            }
+
+    def resize(self, size):
+        """Grow or shrink the pool; surplus workers exit after their current job"""
+        size = max(1, int(size))
+        with self._cond:
+            self._size = size
+            while self._threads < size:
+                self._threads += 1
+                worker = threading.Thread(target=self._worker_loop,
+                                          name=f"{self.name}-worker-{next(self._seq)}")
+                worker.daemon = True
+                worker.start()
+            self._cond.notify_all()
+        self._notify()
+
+    def submit(self, key, fn, *args):
+        """Queue a job under key"""
+        with self._cond:
+            self._pending.setdefault(key, deque()).append((fn, args))
+            self._cond.notify()
+        self._notify()
+
+    def _next_job(self):
+        """Pop the next runnable job, rotating keys; None if all are capped"""
+        for key in list(self._pending):
+            jobs = self._pending[key]
+            if self._running.get(key, 0) < self.limit(key):
+                fn, args = jobs.popleft()
+                self._pending.pop(key)
+                if jobs:
+                    self._pending[key] = jobs  # move to the back of the rotation
+                self._running[key] = self._running.get(key, 0) + 1
+                return key, fn, args
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._threads > self._size:
+                        # Pool shrank - surplus idle workers exit
+                        self._threads -= 1
+                        return
+                    job = self._next_job()
+                    if job:
+                        break
+                    self._cond.wait()
+                key, fn, args = job
+                self._busy += 1
+            self._notify()
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"⚠️ {self.name} worker error: {e}")
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._running[key] -= 1
+                    self._cond.notify_all()
+                self._notify()
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change(self.stats())
+            except Exception as e:
+                print(f"⚠️ {self.name} stats listener error: {e}")
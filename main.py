@@ -12,15 +12,11 @@ import sys
 import threading
 import time
 import subprocess
-import json
-import uuid
 from pathlib import Path
-from urllib.parse import urlparse
 from datetime import datetime
 import queue
 import webbrowser
-import logging
-import traceback
+from collections import deque
 import requests
 import zipfile
 import shutil
@@ -28,6 +24,10 @@ import shutil
 # Version info
 from scripts.version import VERSION as APP_VERSION, GITHUB_API_RELEASES as UPDATE_CHECK_URL, GITHUB_FULL as GITHUB_REPO, get_about_text
 
+# Headless download engine (no tkinter inside)
+from engine import DownloadEngine, is_playlist_url
+from config import QUEUE_DB_FILE
+
 class UpdateManager:
     """Auto-update system for checking and downloading new versions"""
     
@@ -324,100 +324,64 @@ class UIAnimations:
         except:
             pass
 
-class ErrorLogger:
-    """Enhanced error logging system for download failures"""
+class UIUpdateChannel:
+    """Thread-safe channel from worker threads to the Tk main thread
     
-    def __init__(self, download_path):
-        self.download_path = download_path
-        self.log_file = os.path.join(download_path, "czdownloader_errors.log")
-        self.setup_logger()
-        
-    def setup_logger(self):
-        """Setup rotating file logger"""
-        self.logger = logging.getLogger("CZDownloader")
-        self.logger.setLevel(logging.INFO)
-        
-        # Clear existing handlers
-        self.logger.handlers.clear()
-        
-        # File handler with UTF-8 encoding
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-        file_handler.setLevel(logging.INFO)
-        
-        # Formatter with detailed info
-        formatter = logging.Formatter(
-            '%(asctime)s | %(levelname)s | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-        
-    def log_download_error(self, video_item, error_msg, detailed_traceback=None):
-        """Log detailed download error"""
-        try:
-            # Basic error info
-            error_entry = {
-                'timestamp': datetime.now().isoformat(),
-                'video_title': getattr(video_item, 'title', 'Unknown'),
-                'video_url': getattr(video_item, 'url', 'Unknown'),
-                'video_quality': getattr(video_item, 'quality', 'Unknown'),
-                'error_message': str(error_msg),
-                'video_id': getattr(video_item, 'id', 'Unknown')
-            }
-            
-            # Log to file
-            log_msg = f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-🎬 VIDEO DOWNLOAD ERROR
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📺 Title: {error_entry['video_title']}
-🔗 URL: {error_entry['video_url']}
-🎯 Quality: {error_entry['video_quality']}
-🆔 Video ID: {error_entry['video_id']}
-❌ Error: {error_entry['error_message']}"""
-            
-            if detailed_traceback:
-                log_msg += f"\n\n🐛 DETAILED TRACEBACK:\n{detailed_traceback}"
-                
-            log_msg += "\n━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            
-            self.logger.error(log_msg)
-            
-        except Exception as e:
-            print(f"Failed to log error: {e}")
-            
-    def log_batch_summary(self, batch_summary):
-        """Log batch download summary"""
-        try:
-            total = batch_summary.get('total', 0)
-            completed = batch_summary.get('completed', 0)
-            failed = batch_summary.get('failed', 0)
-            start_time = batch_summary.get('start_time')
-            
-            if start_time:
-                duration = datetime.now() - start_time
-                duration_str = str(duration).split('.')[0]
+    Workers post from any thread; the Tk thread drains the channel every
+    `interval_ms` and spends at most `budget_ms` per tick on UI work.
+    Updates are coalesced per key so only the latest state survives a tick.
+    """
+    
+    def __init__(self, root, interval_ms=50, budget_ms=20):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.budget = budget_ms / 1000.0
+        self._lock = threading.Lock()
+        self._calls = deque()  # ordered one-shot calls (add/remove/dialogs)
+        self._updates = {}  # key -> [handler, merged changes]
+        self.root.after(self.interval_ms, self._drain)
+        
+    def post_call(self, fn, *args):
+        """Run fn(*args) on the Tk thread, in posting order"""
+        with self._lock:
+            self._calls.append((fn, args))
+            
+    def post_update(self, key, changes, handler):
+        """Coalesce changes for key; handler(key, changes) runs once per tick"""
+        with self._lock:
+            entry = self._updates.get(key)
+            if entry:
+                entry[1].update(changes)
             else:
-                duration_str = "Unknown"
+                self._updates[key] = [handler, dict(changes)]
                 
-            summary_msg = f"""
-🎯 BATCH DOWNLOAD SUMMARY
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-📊 Total Videos: {total}
-✅ Completed: {completed}
-❌ Failed: {failed}
-📈 Success Rate: {(completed/total*100) if total > 0 else 0:.1f}%
-⏱️ Duration: {duration_str}
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"""
-            
-            self.logger.info(summary_msg)
-            
-        except Exception as e:
-            print(f"Failed to log batch summary: {e}")
-            
-    def get_log_file_path(self):
-        """Get the log file path"""
-        return self.log_file
+    def _drain(self):
+        deadline = time.monotonic() + self.budget
+        try:
+            # Structural calls first so widgets exist before their updates
+            while time.monotonic() < deadline:
+                with self._lock:
+                    if not self._calls:
+                        break
+                    fn, args = self._calls.popleft()
+                try:
+                    fn(*args)
+                except Exception as e:
+                    print(f"⚠️ UI call error: {e}")
+                    
+            while time.monotonic() < deadline:
+                with self._lock:
+                    if not self._updates:
+                        break
+                    key = next(iter(self._updates))
+                    handler, changes = self._updates.pop(key)
+                try:
+                    handler(key, changes)
+                except Exception as e:
+                    print(f"⚠️ UI update error: {e}")
+        finally:
+            # Whatever did not fit in this frame waits for the next tick
+            self.root.after(self.interval_ms, self._drain)
 
 class TroubleshootingHelper:
     """Helper class for troubleshooting common download issues"""
@@ -679,55 +643,36 @@ class ModernStyle:
         """Get color scheme based on theme"""
         return cls.DARK_COLORS if is_dark else cls.COLORS
 
-class VideoItem:
-    """Represents a video in the download queue"""
-    
-    def __init__(self, url, quality="best"):
-        self.id = str(uuid.uuid4())
-        self.url = url
-        self.quality = quality
-        self.status = "pending"  # pending, analyzing, downloading, completed, error, paused, cancelled
-        self.title = "Loading..."
-        self.duration = 0
-        self.uploader = ""
-        self.thumbnail_url = ""
-        self.file_size = 0
-        self.downloaded_size = 0
-        self.speed = 0
-        self.eta = 0
-        self.progress = 0
-        self.progress_mode = "determinate"  # determinate, indeterminate
-        self.error_message = ""
-        self.filename = ""
-        self.added_time = datetime.now()
-        self.retry_count = 0
-        self.max_retries = 3
-        self.cancel_flag = False
-        self.extract_audio = False  # New: audio-only extraction
-        
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'url': self.url,
-            'quality': self.quality,
-            'status': self.status,
-            'title': self.title,
-            'duration': self.duration,
-            'uploader': self.uploader,
-            'progress': self.progress,
-            'filename': self.filename,
-            'added_time': self.added_time.isoformat()
-        }
-
 class VideoListFrame(ttk.Frame):
-    """Modern video list with individual progress bars"""
+    """Virtualized video list - widgets exist only for the visible rows
+    and are recycled while scrolling, so cost stays flat for any queue size"""
+    
+    ROW_HEIGHT = 185  # px per queue row, card included
+    ROW_GAP = 10      # px between cards
+    
+    STATUS_MAP = {
+        'pending': '⏳ Pending',
+        'analyzing': '🔍 Analyzing',
+        'downloading': '⬇️ Downloading',
+        'paused': '⏸️ Paused',
+        'retrying': '🔁 Retrying',
+        'completed': '✅ Completed',
+        'error': '❌ Error',
+        'cancelled': '🚫 Cancelled'
+    }
     
     def __init__(self, parent, app_instance):
         super().__init__(parent)
         self.app = app_instance
-        self.video_widgets = {}
+        self.order = []           # video_ids in display order
+        self.positions = {}       # video_id -> index in self.order
+        self.items = {}           # video_id -> VideoItem
+        self.progress_texts = {}  # video_id -> last progress text
+        self.rows = []            # recyclable row widgets
+        self.bound_rows = {}      # video_id -> row currently showing it
+        self._refresh_pending = False
         self.setup_ui()
-        
+    
     def setup_ui(self):
         # Header
         header_frame = ttk.Frame(self)
@@ -737,6 +682,18 @@ class VideoListFrame(ttk.Frame):
                                font=ModernStyle.FONTS['heading'])
         title_label.pack(side=tk.LEFT)
         
+        # Download slot occupancy
+        self.slots_var = tk.StringVar(value="")
+        slots_label = ttk.Label(header_frame, textvariable=self.slots_var,
+                               font=ModernStyle.FONTS['small'])
+        slots_label.pack(side=tk.LEFT, padx=(15, 0))
+        
+        # Analysis queue depth
+        self.analysis_var = tk.StringVar(value="")
+        analysis_label = ttk.Label(header_frame, textvariable=self.analysis_var,
+                                  font=ModernStyle.FONTS['small'])
+        analysis_label.pack(side=tk.LEFT, padx=(15, 0))
+        
         # Action buttons
         btn_frame = ttk.Frame(header_frame)
         btn_frame.pack(side=tk.RIGHT)
@@ -751,75 +708,192 @@ class VideoListFrame(ttk.Frame):
         
         # Scrollable list
         self.setup_scrollable_list()
-        
+    
     def setup_scrollable_list(self):
-        # Create canvas and scrollbar for custom scrolling
+        # Canvas holds one embedded window per recycled row
         canvas_frame = ttk.Frame(self)
         canvas_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
         
         # Canvas
         self.canvas = tk.Canvas(canvas_frame, highlightthickness=0, 
-                               bg=self.app.current_colors['bg_secondary'])
+                               bg=self.app.current_colors['bg_secondary'],
+                               yscrollincrement=self.ROW_HEIGHT // 5)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.on_scroll)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.canvas.configure(yscrollcommand=scrollbar.set)
         
-        # Scrollable frame
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        self.canvas_frame_id = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        
         # Bind events
-        self.scrollable_frame.bind("<Configure>", self.on_frame_configure)
         self.canvas.bind("<Configure>", self.on_canvas_configure)
         
         # Mouse wheel scrolling
-        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
-        
-    def on_frame_configure(self, event):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        
+        self.bind_mousewheel(self.canvas)
+    
+    def bind_mousewheel(self, widget):
+        """Scroll the list with the wheel over widget (and its children)"""
+        widget.bind("<MouseWheel>", self.on_mousewheel)
+        widget.bind("<Button-4>", self.on_mousewheel)  # Linux scroll up
+        widget.bind("<Button-5>", self.on_mousewheel)  # Linux scroll down
+        for child in widget.winfo_children():
+            self.bind_mousewheel(child)
+    
     def on_canvas_configure(self, event):
-        canvas_width = event.width
-        self.canvas.itemconfig(self.canvas_frame_id, width=canvas_width)
-        
+        for row in self.rows:
+            self.canvas.itemconfig(row['window'], width=self.row_width())
+        self.schedule_refresh()
+    
+    def on_scroll(self, *args):
+        self.canvas.yview(*args)
+        self.refresh_visible()
+    
     def on_mousewheel(self, event):
-        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        
+        if getattr(event, 'num', None) == 4:
+            delta = -1
+        elif getattr(event, 'num', None) == 5:
+            delta = 1
+        else:
+            delta = int(-1*(event.delta/120))
+        self.canvas.yview_scroll(delta, "units")
+        self.refresh_visible()
+    
+    def row_width(self):
+        return max(1, self.canvas.winfo_width() - 2 * self.ROW_GAP)
+    
+    # ------------------------------------------------------------------
+    # Queue model (no widgets involved)
+    # ------------------------------------------------------------------
+    
     def add_video(self, video_item):
         """Add a video item to the list"""
-        video_widget = self.create_video_widget(video_item)
-        self.video_widgets[video_item.id] = video_widget
+        self.positions[video_item.id] = len(self.order)
+        self.order.append(video_item.id)
+        self.items[video_item.id] = video_item
+        self.schedule_refresh()
+    
+    def add_videos(self, video_items):
+        """Add many video items at once (e.g. a restored queue)"""
+        for video_item in video_items:
+            self.positions[video_item.id] = len(self.order)
+            self.order.append(video_item.id)
+            self.items[video_item.id] = video_item
+        self.schedule_refresh()
+    
+    def remove_video(self, video_id):
+        """Remove video from list"""
+        if video_id not in self.positions:
+            return
+        index = self.positions.pop(video_id)
+        del self.order[index]
+        for i in range(index, len(self.order)):
+            self.positions[self.order[i]] = i
+        self.items.pop(video_id, None)
+        self.progress_texts.pop(video_id, None)
+        self.schedule_refresh()
+    
+    def remove_all(self):
+        """Remove every video from the list"""
+        self.order = []
+        self.positions = {}
+        self.items = {}
+        self.progress_texts = {}
+        self.schedule_refresh()
+    
+    def update_video(self, video_id, **kwargs):
+        """Update video row with new data (only drawn if visible)"""
+        video_item = self.items.get(video_id)
+        if video_item is None:
+            return
         
-    def create_video_widget(self, video_item):
-        """Create a modern video widget"""
+        # Remember progress text so a recycled row can show it later
+        progress_text = self.format_progress_text(video_item, kwargs)
+        if progress_text is not None:
+            self.progress_texts[video_id] = progress_text
+        
+        row = self.bound_rows.get(video_id)
+        if row and row['video_id'] == video_id:
+            self.render_row(row, video_item, kwargs)
+    
+    # ------------------------------------------------------------------
+    # Row pool
+    # ------------------------------------------------------------------
+    
+    def schedule_refresh(self):
+        """Coalesce many model changes into one redraw"""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh)
+    
+    def _refresh(self):
+        self._refresh_pending = False
+        height = len(self.order) * self.ROW_HEIGHT
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), height))
+        self.refresh_visible()
+    
+    def refresh_visible(self):
+        """Bind the row pool to the videos currently in view"""
+        self.ensure_row_pool()
+        first = max(0, int(self.canvas.canvasy(0))) // self.ROW_HEIGHT
+        self.bound_rows = {}
+        
+        for offset, row in enumerate(self.rows):
+            index = first + offset
+            if index < len(self.order):
+                video_id = self.order[index]
+                self.canvas.coords(row['window'], self.ROW_GAP, index * self.ROW_HEIGHT + self.ROW_GAP // 2)
+                self.canvas.itemconfigure(row['window'], state='normal')
+                if row['video_id'] != video_id:
+                    row['video_id'] = video_id
+                    self.render_row(row, self.items[video_id])
+                self.bound_rows[video_id] = row
+            else:
+                self.canvas.itemconfigure(row['window'], state='hidden')
+                row['video_id'] = None
+    
+    def ensure_row_pool(self):
+        """Create enough rows to cover the visible area (plus one partial row)"""
+        needed = max(1, self.canvas.winfo_height()) // self.ROW_HEIGHT + 2
+        while len(self.rows) < needed:
+            self.rows.append(self.create_row())
+    
+    def rebuild_rows(self):
+        """Recreate the row pool (e.g. after a theme change)"""
+        for row in self.rows:
+            self.canvas.delete(row['window'])
+            row['container'].destroy()
+        self.rows = []
+        self.bound_rows = {}
+        self.schedule_refresh()
+    
+    def create_row(self):
+        """Create one recyclable row card"""
         colors = self.app.current_colors
+        row = {'video_id': None}
         
         # Main container with modern card styling
-        container = tk.Frame(self.scrollable_frame, 
+        container = tk.Frame(self.canvas, 
                            bg=colors['bg_card'],
                            relief="solid", 
                            bd=1,
                            highlightbackground=colors['border'],
                            highlightthickness=1)
-        container.pack(fill=tk.X, padx=10, pady=5)
+        container.pack_propagate(False)
         
         # Inner frame with padding
         inner_frame = tk.Frame(container, bg=colors['bg_card'])
-        inner_frame.pack(fill=tk.X, padx=15, pady=15)
+        inner_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=12)
         
         # Top row: Title and controls
         top_row = tk.Frame(inner_frame, bg=colors['bg_card'])
-        top_row.pack(fill=tk.X, pady=(0, 10))
+        top_row.pack(fill=tk.X, pady=(0, 8))
         
         # Video info
         info_frame = tk.Frame(top_row, bg=colors['bg_card'])
         info_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         # Title - allow full length with wrapping
-        title_label = tk.Label(info_frame, text=video_item.title, 
+        title_label = tk.Label(info_frame, text="", 
                               font=ModernStyle.FONTS['subheading'],
                               fg=colors['text_primary'],
                               bg=colors['bg_card'],
@@ -827,10 +901,11 @@ class VideoListFrame(ttk.Frame):
                               wraplength=600,  # Allow wrapping instead of truncating
                               justify="left")
         title_label.pack(anchor=tk.W, fill=tk.X)
+        # Double-click loads full details of a video queued from a playlist
+        title_label.bind("<Double-Button-1>", lambda e: self.row_action(row, self.load_details))
         
         # URL and details
-        url_text = video_item.url[:60] + "..." if len(video_item.url) > 60 else video_item.url
-        url_label = tk.Label(info_frame, text=url_text,
+        url_label = tk.Label(info_frame, text="",
                             font=ModernStyle.FONTS['small'],
                             fg=colors['text_secondary'],
                             bg=colors['bg_card'],
@@ -853,30 +928,31 @@ class VideoListFrame(ttk.Frame):
             'cursor': 'hand2'
         }
         
+        # Buttons act on whichever video the row currently shows
         pause_btn = tk.Button(controls_frame, text="⏸️", 
-                             command=lambda: self.pause_video(video_item.id),
+                             command=lambda: self.row_action(row, self.pause_video),
                              **btn_style)
         pause_btn.pack(side=tk.LEFT, padx=2)
         
         cancel_btn = tk.Button(controls_frame, text="❌",
-                              command=lambda: self.cancel_video(video_item.id),
+                              command=lambda: self.row_action(row, self.cancel_video),
                               **btn_style)
         cancel_btn.pack(side=tk.LEFT, padx=2)
         
         retry_btn = tk.Button(controls_frame, text="🔄",
-                             command=lambda: self.retry_video(video_item.id),
+                             command=lambda: self.row_action(row, self.retry_video),
                              **btn_style)
         retry_btn.pack(side=tk.LEFT, padx=2)
         
         # Help button for errors
         help_btn = tk.Button(controls_frame, text="❓",
-                            command=lambda: self.show_help(video_item.id),
+                            command=lambda: self.row_action(row, self.show_help),
                             **btn_style)
         help_btn.pack(side=tk.LEFT, padx=2)
         
         # Middle row: Progress bar
         progress_frame = tk.Frame(inner_frame, bg=colors['bg_card'])
-        progress_frame.pack(fill=tk.X, pady=(0, 10))
+        progress_frame.pack(fill=tk.X, pady=(0, 8))
         
         # Progress bar (custom styling with indeterminate support)
         progress_var = tk.DoubleVar()
@@ -884,7 +960,7 @@ class VideoListFrame(ttk.Frame):
                                      maximum=100, style="Custom.Horizontal.TProgressbar")
         progress_bar.pack(fill=tk.X, pady=(0, 5))
         
-        # Progress text with animation support
+        # Progress text
         progress_text = tk.Label(progress_frame, text="Pending...",
                                 font=ModernStyle.FONTS['small'],
                                 fg=colors['text_secondary'],
@@ -897,36 +973,34 @@ class VideoListFrame(ttk.Frame):
         bottom_row.pack(fill=tk.X)
         
         # Status
-        status_label = tk.Label(bottom_row, text=f"Status: {video_item.status}",
+        status_label = tk.Label(bottom_row, text="",
                                font=ModernStyle.FONTS['small'],
                                fg=colors['text_primary'],
                                bg=colors['bg_card'])
         status_label.pack(side=tk.LEFT)
         
         # Quality and time
-        meta_label = tk.Label(bottom_row, text=f"Quality: {video_item.quality} • Added: {video_item.added_time.strftime('%H:%M')}",
+        meta_label = tk.Label(bottom_row, text="",
                              font=ModernStyle.FONTS['small'],
                              fg=colors['text_secondary'],
                              bg=colors['bg_card'])
         meta_label.pack(side=tk.RIGHT)
         
-        # Error message row (initially hidden)
+        # Error message row (shown only for failed videos)
         error_frame = tk.Frame(inner_frame, bg=colors['bg_card'])
-        if video_item.status == "error" and video_item.error_message:
-            error_frame.pack(fill=tk.X, pady=(5, 0))
-            error_icon = tk.Label(error_frame, text="⚠️", font=("Segoe UI", 10),
-                                 bg=colors['bg_card'])
-            error_icon.pack(side=tk.LEFT, padx=(0, 5))
-            error_label = tk.Label(error_frame, text=video_item.error_message,
-                                  font=ModernStyle.FONTS['small'],
-                                  fg=colors['error'], 
-                                  bg=colors['bg_card'],
-                                  wraplength=500,
-                                  anchor="w", justify="left")
-            error_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        # Store references for updates
-        widget_data = {
+        error_icon = tk.Label(error_frame, text="⚠️", font=("Segoe UI", 10),
+                             bg='#fef2f2', fg='#dc2626')
+        error_icon.pack(side=tk.LEFT, padx=(0, 8))
+        error_label = tk.Label(error_frame, text="",
+                              font=ModernStyle.FONTS['small'],
+                              fg=colors['error'], 
+                              bg=colors['bg_card'],
+                              wraplength=450, anchor="w", justify="left")
+        error_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        self.bind_mousewheel(container)
+        
+        row.update({
             'container': container,
             'title_label': title_label,
             'url_label': url_label,
@@ -934,247 +1008,231 @@ class VideoListFrame(ttk.Frame):
             'progress_bar': progress_bar,
             'progress_text': progress_text,
             'status_label': status_label,
+            'meta_label': meta_label,
             'pause_btn': pause_btn,
             'cancel_btn': cancel_btn,
             'retry_btn': retry_btn,
             'help_btn': help_btn,
             'error_frame': error_frame,
-            'video_item': video_item
-        }
+            'error_label': error_label,
+            'window': self.canvas.create_window(self.ROW_GAP, 0, window=container, anchor="nw",
+                                                width=self.row_width(),
+                                                height=self.ROW_HEIGHT - self.ROW_GAP,
+                                                state='hidden'),
+        })
+        return row
+    
+    def row_action(self, row, action):
+        """Run a button action for the video shown in row"""
+        if row['video_id']:
+            action(row['video_id'])
+    
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+    
+    def format_progress_text(self, video_item, changes):
+        """Progress line for a set of changes, or None if unchanged"""
+        if 'progress' not in changes and 'progress_mode' not in changes:
+            return None
+        
+        progress_mode = changes.get('progress_mode', video_item.progress_mode)
+        progress_value = changes.get('progress', video_item.progress)
+        if progress_mode == 'indeterminate':
+            return "🔄 Downloading... (size unknown)"
+        
+        if 'speed' in changes and 'eta' in changes:
+            speed_mb = (changes.get('speed') or 0) / 1024 / 1024
+            eta = changes.get('eta') or 0
+            if speed_mb > 0 and eta > 0:
+                return f"📥 {progress_value:.1f}% • {speed_mb:.1f} MB/s • ETA: {eta}s"
+            elif progress_value > 0:
+                return f"📥 {progress_value:.1f}% • Processing..."
+            return "📥 Starting download..."
+        elif progress_value > 0:
+            return f"📥 {progress_value:.1f}% complete"
+        return None
+    
+    def render_row(self, row, video_item, changes=None):
+        """Draw video_item into row; with changes, only the changed parts"""
+        full = changes is None
+        changes = changes or {}
         
-        return widget_data
+        if full:
+            url_text = video_item.url[:60] + "..." if len(video_item.url) > 60 else video_item.url
+            row['url_label'].config(text=url_text)
+            row['meta_label'].config(text=f"Quality: {video_item.quality} • Added: {video_item.added_time.strftime('%H:%M')}")
         
-    def update_video(self, video_id, **kwargs):
-        """Update video widget with new data"""
-        if video_id not in self.video_widgets:
-            return
-            
-        widget = self.video_widgets[video_id]
-        video_item = widget['video_item']
+        if full or 'title' in changes:
+            row['title_label'].config(text=video_item.title)
         
-        # Update video item
-        for key, value in kwargs.items():
-            setattr(video_item, key, value)
-            
-        # Update UI elements
-        if 'title' in kwargs:
-            widget['title_label'].config(text=kwargs['title'])
-            
-        if 'progress' in kwargs or 'progress_mode' in kwargs:
-            progress_mode = getattr(video_item, 'progress_mode', 'determinate')
-            progress_value = kwargs.get('progress', video_item.progress)
+        if full or 'progress' in changes or 'progress_mode' in changes:
+            progress_mode = changes.get('progress_mode', video_item.progress_mode)
+            current_mode = str(row['progress_bar'].cget('mode'))
             
             if progress_mode == 'indeterminate':
                 # Switch to indeterminate mode for unknown total
-                widget['progress_bar'].config(mode='indeterminate')
-                widget['progress_bar'].start(10)  # Animate every 10ms
-                widget['progress_bar'].update_idletasks()
-                widget['progress_text'].config(text="🔄 Downloading... (size unknown)")
+                if current_mode != 'indeterminate':
+                    row['progress_bar'].config(mode='indeterminate')
+                    row['progress_bar'].start(10)  # Animate every 10ms
             else:
                 # Determinate mode with percentage
-                widget['progress_bar'].config(mode='determinate')
-                widget['progress_bar'].stop()
-                widget['progress_bar'].update_idletasks()
-                
-                # Smooth progress animation
-                try:
-                    current_progress = widget['progress_var'].get()
-                    if abs(progress_value - current_progress) > 1:  # Only animate significant changes
-                        UIAnimations.slide_in_progress(widget['progress_bar'], progress_value)
-                    else:
-                        widget['progress_var'].set(progress_value)
-                except:
-                    widget['progress_var'].set(progress_value)
-                
-                # Update progress text with details
-                if 'speed' in kwargs and 'eta' in kwargs:
-                    speed_mb = kwargs.get('speed', 0) / 1024 / 1024 if kwargs.get('speed') else 0
-                    eta = kwargs.get('eta', 0) or 0
-                    if speed_mb > 0 and eta > 0:
-                        widget['progress_text'].config(text=f"📥 {progress_value:.1f}% • {speed_mb:.1f} MB/s • ETA: {eta}s")
-                    elif progress_value > 0:
-                        widget['progress_text'].config(text=f"📥 {progress_value:.1f}% • Processing...")
-                    else:
-                        widget['progress_text'].config(text="📥 Starting download...")
-                elif progress_value > 0:
-                    widget['progress_text'].config(text=f"📥 {progress_value:.1f}% complete")
-            
-        if 'status' in kwargs:
-            # Map status to emoji and user-friendly text
-            status_map = {
-                'pending': '⏳ Pending',
-                'analyzing': '🔍 Analyzing',
-                'downloading': '⬇️ Downloading',
-                'paused': '⏸️ Paused',
-                'completed': '✅ Completed',
-                'error': '❌ Error',
-                'cancelled': '🚫 Cancelled'
-            }
-            display_text = status_map.get(kwargs['status'], kwargs['status'].capitalize())
-            widget['status_label'].config(text=display_text)
-            
-            # Enhanced status display with colors
-            colors = self.app.current_colors
-            status_color = colors['text_primary']
-            if kwargs['status'] == "downloading":
-                status_color = colors['primary']
-            elif kwargs['status'] == "completed":
-                status_color = colors['success']
-            elif kwargs['status'] == "error":
-                status_color = colors['error']
-            elif kwargs['status'] == "analyzing":
-                status_color = colors['warning']
-                
-            widget['status_label'].config(fg=status_color)
-
-            # Enhanced error message display
-            if kwargs['status'] == "error" and hasattr(video_item, 'error_message') and video_item.error_message:
-                # Clear existing error display
-                for child in widget['error_frame'].winfo_children():
-                    child.destroy()
-                    
-                # Enhanced error display with better styling
-                error_container = tk.Frame(widget['error_frame'], bg=colors['bg_card'])
-                error_container.pack(fill=tk.X)
-                
-                # Error icon with styled background
-                error_icon_frame = tk.Frame(error_container, bg='#fef2f2', width=30, height=25, relief='solid', bd=1)
-                error_icon_frame.pack(side=tk.LEFT, padx=(0, 10), pady=2)
-                error_icon_frame.pack_propagate(False)
-                
-                error_icon = tk.Label(error_icon_frame, text="⚠️", font=("Segoe UI", 12),
-                                     bg='#fef2f2', fg='#dc2626')
-                error_icon.pack(expand=True)
-                
-                # Error message with better formatting
-                error_text_frame = tk.Frame(error_container, bg=colors['bg_card'])
-                error_text_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
-                
-                error_title = tk.Label(error_text_frame, text="Download Error:",
-                                      font=("Segoe UI", 9, "bold"),
-                                      fg=colors['error'],
-                                      bg=colors['bg_card'],
-                                      anchor="w")
-                error_title.pack(anchor=tk.W, fill=tk.X)
-                
-                error_label = tk.Label(error_text_frame, text=video_item.error_message,
-                                      font=ModernStyle.FONTS['small'],
-                                      fg=colors['text_secondary'], 
-                                      bg=colors['bg_card'],
-                                      wraplength=450, anchor="w", justify="left")
-                error_label.pack(anchor=tk.W, fill=tk.X)
-                
-                widget['error_frame'].pack(fill=tk.X, pady=(8, 0))
-            else:
-                # Hide error message
-                widget['error_frame'].pack_forget()
-            
-            # Update button states based on status
-            status = kwargs['status']
-            if status == "downloading":
-                widget['pause_btn'].config(state="normal", text="⏸️")
-                widget['cancel_btn'].config(state="normal")
-                widget['retry_btn'].config(state="disabled")
-                widget['help_btn'].config(state="disabled")
-            elif status == "paused":
-                widget['pause_btn'].config(state="normal", text="▶️")
-                widget['cancel_btn'].config(state="normal")
-                widget['retry_btn'].config(state="normal")
-                widget['help_btn'].config(state="disabled")
-            elif status == "error":
-                widget['pause_btn'].config(state="disabled")
-                widget['cancel_btn'].config(state="disabled") 
-                widget['retry_btn'].config(state="normal")
-                widget['help_btn'].config(state="normal")
-            elif status in ["completed", "cancelled"]:
-                widget['pause_btn'].config(state="disabled")
-                widget['cancel_btn'].config(state="disabled") 
-                widget['retry_btn'].config(state="disabled" if status == "completed" else "normal")
-                widget['help_btn'].config(state="disabled")
-            else:  # pending, analyzing
-                widget['pause_btn'].config(state="disabled")
-                widget['cancel_btn'].config(state="normal")
-                widget['retry_btn'].config(state="disabled")
-                widget['help_btn'].config(state="disabled")
-                
-        # Update progress text
-        if 'speed' in kwargs and 'eta' in kwargs:
-            speed_mb = kwargs.get('speed', 0) / 1024 / 1024
-            eta = kwargs.get('eta', 0)
-            progress_text = f"{video_item.progress:.1f}% • {speed_mb:.1f} MB/s • ETA: {eta}s"
-            widget['progress_text'].config(text=progress_text)
-            
-    def remove_video(self, video_id):
-        """Remove video from list"""
-        if video_id in self.video_widgets:
-            widget = self.video_widgets[video_id]
-            widget['container'].destroy()
-            del self.video_widgets[video_id]
+                if current_mode != 'determinate':
+                    row['progress_bar'].stop()
+                    row['progress_bar'].config(mode='determinate')
+                row['progress_var'].set(changes.get('progress', video_item.progress))
             
+            row['progress_text'].config(text=self.progress_texts.get(video_item.id, "Pending..."))
+        
+        if full or 'status' in changes:
+            self.render_status(row, video_item)
+    
+    def render_status(self, row, video_item):
+        """Status label, colors, error message and button states"""
+        status = video_item.status
+        colors = self.app.current_colors
+        
+        # Map status to emoji and user-friendly text
+        row['status_label'].config(text=self.STATUS_MAP.get(status, status.capitalize()))
+        
+        # Enhanced status display with colors
+        status_color = colors['text_primary']
+        if status == "downloading":
+            status_color = colors['primary']
+        elif status == "completed":
+            status_color = colors['success']
+        elif status == "error":
+            status_color = colors['error']
+        elif status == "analyzing":
+            status_color = colors['warning']
+        row['status_label'].config(fg=status_color)
+        
+        # Error message display
+        if status == "error" and video_item.error_message:
+            row['error_label'].config(text=f"Download Error: {video_item.error_message}")
+            row['error_frame'].pack(fill=tk.X, pady=(6, 0))
+        else:
+            row['error_frame'].pack_forget()
+        
+        # Update button states based on status
+        if status == "downloading":
+            row['pause_btn'].config(state="normal", text="⏸️")
+            row['cancel_btn'].config(state="normal")
+            row['retry_btn'].config(state="disabled")
+            row['help_btn'].config(state="disabled")
+        elif status == "paused":
+            row['pause_btn'].config(state="normal", text="▶️")
+            row['cancel_btn'].config(state="normal")
+            row['retry_btn'].config(state="normal")
+            row['help_btn'].config(state="disabled")
+        elif status == "error":
+            row['pause_btn'].config(state="disabled", text="⏸️")
+            row['cancel_btn'].config(state="disabled") 
+            row['retry_btn'].config(state="normal")
+            row['help_btn'].config(state="normal")
+        elif status in ["completed", "cancelled"]:
+            row['pause_btn'].config(state="disabled", text="⏸️")
+            row['cancel_btn'].config(state="disabled") 
+            row['retry_btn'].config(state="disabled" if status == "completed" else "normal")
+            row['help_btn'].config(state="disabled")
+        elif status in ["pending", "retrying"]:
+            row['pause_btn'].config(state="normal", text="⏸️")
+            row['cancel_btn'].config(state="normal")
+            row['retry_btn'].config(state="disabled")
+            row['help_btn'].config(state="disabled")
+        else:  # analyzing
+            row['pause_btn'].config(state="disabled", text="⏸️")
+            row['cancel_btn'].config(state="normal")
+            row['retry_btn'].config(state="disabled")
+            row['help_btn'].config(state="disabled")
+    
+    def update_slots(self, stats):
+        """Show download pool occupancy"""
+        text = f"⚡ {stats['busy']}/{stats['size']} slots busy"
+        if self.app.engine.auto_concurrency:
+            text += " (auto)"
+        if stats['delayed']:
+            text += f" • 🔁 {stats['delayed']} waiting to retry"
+        self.slots_var.set(text)
+    
+    def update_analysis(self, stats):
+        """Show analysis pool depth (hidden when idle)"""
+        if not stats['busy'] and not stats['queued']:
+            self.analysis_var.set("")
+            return
+        text = f"🔍 Analyzing {stats['busy']}"
+        if stats['queued']:
+            text += f" • {stats['queued']} queued"
+        self.analysis_var.set(text)
+    
     def clear_all(self):
         """Clear all videos from list"""
         if messagebox.askyesno("Confirm", "Clear all videos from queue?"):
-            for video_id in list(self.video_widgets.keys()):
-                self.remove_video(video_id)
-            self.app.video_queue.clear()
-            
+            self.app.engine.clear_queue()
+    
     def download_all(self):
         """Start downloading all pending videos"""
         self.app.start_batch_download()
-        
+    
     def pause_video(self, video_id):
         """Pause/resume video download"""
         self.app.toggle_video_download(video_id)
-        
+    
     def cancel_video(self, video_id):
         """Cancel video download"""
         self.app.cancel_video_download(video_id)
-        
+    
     def retry_video(self, video_id):
         """Retry failed video download"""
         self.app.retry_video_download(video_id)
-        
+    
+    def load_details(self, video_id):
+        """Run the deferred analysis of a playlist entry"""
+        self.app.engine.analyze_details(video_id)
+    
     def show_help(self, video_id):
         """Show help for video error"""
-        if video_id in self.video_widgets:
-            video_item = self.video_widgets[video_id]['video_item']
-            if video_item.status == "error" and video_item.error_message:
-                # Detect platform from URL
-                platform = ""
-                if 'tiktok.com' in video_item.url:
-                    platform = "tiktok"
-                elif 'instagram.com' in video_item.url:
-                    platform = "instagram"
-                elif 'facebook.com' in video_item.url or 'fb.watch' in video_item.url:
-                    platform = "facebook"
-                elif 'youtube.com' in video_item.url or 'youtu.be' in video_item.url:
-                    platform = "youtube"
-                
-                TroubleshootingHelper.show_help_dialog(self.app.root, video_item.error_message, platform)
+        video_item = self.items.get(video_id)
+        if video_item and video_item.status == "error" and video_item.error_message:
+            # Detect platform from URL
+            platform = ""
+            if 'tiktok.com' in video_item.url:
+                platform = "tiktok"
+            elif 'instagram.com' in video_item.url:
+                platform = "instagram"
+            elif 'facebook.com' in video_item.url or 'fb.watch' in video_item.url:
+                platform = "facebook"
+            elif 'youtube.com' in video_item.url or 'youtu.be' in video_item.url:
+                platform = "youtube"
+            
+            TroubleshootingHelper.show_help_dialog(self.app.root, video_item.error_message, platform)
 
 class ModernVideoDownloader:
     """Modern video downloader with advanced UI"""
     
     def __init__(self, root):
         self.root = root
-        self.video_queue = {}  # video_id -> VideoItem
-        self.download_threads = {}  # video_id -> thread
         self.is_dark_theme = False
         self.current_colors = ModernStyle.get_colors(False)
+        
+        # Headless engine owns the queue, workers and yt-dlp options;
+        # the queue is persisted so it survives crashes and restarts
+        self.engine = DownloadEngine(queue_file=QUEUE_DB_FILE)
+        self.error_logger = self.engine.error_logger
         self.download_path = ""
-        self.batch_summary = {
-            'total': 0,
-            'completed': 0,
-            'failed': 0,
-            'errors': []
-        }
         
         self.setup_ui()
         self.setup_download_folder()
         self.apply_modern_styles()
+        self.bind_engine_settings()
+        
+        # Engine events arrive on worker threads; the Tk thread drains them
+        self.ui_channel = UIUpdateChannel(self.root)
+        self.engine.subscribe(self.on_engine_event)
         
-        # Initialize error logger after download folder is set
-        self.error_logger = ErrorLogger(self.download_path)
+        # Restore the saved queue in the background (no re-analysis)
+        threading.Thread(target=self.engine.restore_queue, daemon=True).start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
         # Initialize update manager
         self.update_manager = UpdateManager(self)
@@ -1281,6 +1339,12 @@ class ModernVideoDownloader:
                             command=self.add_url_to_queue, width=15)
         add_btn.pack(side=tk.RIGHT)
         
+        # Shown while playlists are being expanded in the background
+        self.expansions = []
+        self.syncing = []  # expansions of the running subscription sync
+        self.cancel_expansion_btn = ttk.Button(url_frame, text="⏹️ Stop Playlist",
+                                              command=self.cancel_expansions, width=15)
+        
         # URL validation indicator
         self.url_status_var = tk.StringVar(value="Paste video URLs here...")
         url_status = ttk.Label(url_section, textvariable=self.url_status_var,
@@ -1321,6 +1385,15 @@ class ModernVideoDownloader:
                                    command=lambda: self.bulk_text.delete(1.0, tk.END))
         bulk_clear_btn.pack(side=tk.RIGHT)
         
+        # Subscriptions: channels/playlists synced incrementally
+        sync_btn = ttk.Button(bulk_actions, text="🔁 Sync Subscriptions",
+                             command=self.sync_subscriptions)
+        sync_btn.pack(side=tk.LEFT)
+        
+        subscribe_btn = ttk.Button(bulk_actions, text="⭐ Subscribe to URL",
+                                  command=self.subscribe_url)
+        subscribe_btn.pack(side=tk.LEFT, padx=(5, 0))
+        
         # Settings section
         settings_section = ttk.LabelFrame(self.download_tab, text="⚙️ Download Settings", padding="20")
         settings_section.pack(fill=tk.X, padx=20, pady=(0, 20))
@@ -1394,6 +1467,13 @@ class ModernVideoDownloader:
                                      variable=self.audio_only_var)
         audio_check.pack(anchor=tk.W, pady=(0, 10))
         
+        # Partial files of cancelled downloads
+        self.keep_partial_var = tk.BooleanVar(value=False)
+        keep_partial_check = ttk.Checkbutton(options_section,
+                                            text="🧩 Keep partial files of cancelled downloads",
+                                            variable=self.keep_partial_var)
+        keep_partial_check.pack(anchor=tk.W, pady=(0, 10))
+        
         # Filename template
         filename_frame = ttk.Frame(options_section)
         filename_frame.pack(fill=tk.X, pady=(0, 10))
@@ -1418,11 +1498,46 @@ class ModernVideoDownloader:
         ttk.Label(concurrent_frame, text="⚡ Max concurrent downloads:", 
                  font=ModernStyle.FONTS['body']).pack(side=tk.LEFT, padx=(0, 10))
         
-        self.concurrent_var = tk.StringVar(value="2")
         concurrent_spin = ttk.Spinbox(concurrent_frame, from_=1, to=5, 
                                      textvariable=self.concurrent_var, width=10)
         concurrent_spin.pack(side=tk.LEFT)
         
+        # Auto mode tunes the number of downloads from measured throughput
+        self.auto_concurrency_var = tk.BooleanVar(value=False)
+        auto_check = ttk.Checkbutton(concurrent_frame, text="🤖 Auto (tune for best speed)",
+                                    variable=self.auto_concurrency_var)
+        auto_check.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Connections per file for the built-in downloader
+        connections_frame = ttk.Frame(options_section)
+        connections_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Label(connections_frame, text="🔀 Connections per download:", 
+                 font=ModernStyle.FONTS['body']).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.connections_var = tk.IntVar(value=self.engine.connections)
+        connections_spin = ttk.Spinbox(connections_frame, from_=1, to=16,
+                                      textvariable=self.connections_var, width=10)
+        connections_spin.pack(side=tk.LEFT)
+        
+        # One shared aria2c process instead of the built-in downloader
+        self.aria2_rpc_var = tk.BooleanVar(value=False)
+        aria2_check = ttk.Checkbutton(connections_frame, text="🚀 Use aria2c daemon (if installed)",
+                                     variable=self.aria2_rpc_var)
+        aria2_check.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Bandwidth limit (shared by all downloads)
+        bandwidth_frame = ttk.Frame(options_section)
+        bandwidth_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Label(bandwidth_frame, text="📶 Bandwidth limit (MB/s, 0 = unlimited):", 
+                 font=ModernStyle.FONTS['body']).pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.bandwidth_var = tk.DoubleVar(value=0)
+        bandwidth_spin = ttk.Spinbox(bandwidth_frame, from_=0, to=1000, increment=0.5,
+                                    textvariable=self.bandwidth_var, width=10)
+        bandwidth_spin.pack(side=tk.LEFT)
+        
         # About section
         about_section = ttk.LabelFrame(self.settings_tab, text="ℹ️ About", padding="20")
         about_section.pack(fill=tk.X, padx=20, pady=(0, 20))
@@ -1460,6 +1575,18 @@ Powered by yt-dlp"""
                                command=self.import_queue)
         import_btn.pack(side=tk.LEFT)
         
+        if self.engine.metadata_cache:
+            clear_cache_btn = ttk.Button(queue_btn_frame, text="🧹 Clear Metadata Cache",
+                                        command=self.clear_metadata_cache)
+            clear_cache_btn.pack(side=tk.LEFT, padx=(10, 0))
+        
+    def clear_metadata_cache(self):
+        """Forget cached analysis results so videos are re-analyzed"""
+        stats = self.engine.metadata_cache.stats()
+        if messagebox.askyesno("Confirm", f"Clear {stats['entries']} cached video analyses?"):
+            self.engine.metadata_cache.clear()
+            messagebox.showinfo("Metadata Cache", "🧹 Metadata cache cleared")
+        
     def apply_modern_styles(self):
         """Apply modern styling to ttk widgets"""
         self.style = ttk.Style()
@@ -1554,11 +1681,73 @@ Powered by yt-dlp"""
                        
     def setup_download_folder(self):
         """Setup download folder"""
-        downloads_path = Path.home() / "Downloads" / "czDownloader"
-        downloads_path.mkdir(parents=True, exist_ok=True)
-        self.download_path = str(downloads_path)
+        self.download_path = self.engine.download_path
         self.folder_var.set(self.download_path)
         
+    def bind_engine_settings(self):
+        """Keep engine settings in sync with the Tk variables"""
+        bindings = {
+            'default_quality': self.quality_var,
+            'max_concurrent': self.concurrent_var,
+            'audio_only': self.audio_only_var,
+            'filename_template': self.filename_template_var,
+            'keep_partial_files': self.keep_partial_var,
+            'auto_concurrency': self.auto_concurrency_var,
+            'connections': self.connections_var,
+            'aria2_rpc': self.aria2_rpc_var,
+        }
+        for key, var in bindings.items():
+            var.trace_add("write", lambda *args, key=key, var=var: self.sync_engine_setting(key, var))
+            self.sync_engine_setting(key, var)
+        
+        # Shown in MB/s, the engine takes bytes/s
+        self.bandwidth_var.trace_add("write", lambda *args: self.sync_bandwidth_limit())
+        self.sync_bandwidth_limit()
+            
+    def sync_engine_setting(self, key, var):
+        """Push a single Tk variable value to the engine"""
+        try:
+            self.engine.configure(**{key: var.get()})
+        except (ValueError, tk.TclError):
+            pass  # Ignore partial input (e.g. empty spinbox)
+            
+    def sync_bandwidth_limit(self):
+        """Push the bandwidth limit to the engine"""
+        try:
+            self.engine.configure(bandwidth_limit=int(float(self.bandwidth_var.get()) * 1024 * 1024))
+        except (ValueError, tk.TclError):
+            pass  # Ignore partial input (e.g. empty spinbox)
+            
+    def on_engine_event(self, event, video_item, changes):
+        """Forward engine events to the UI (called from any thread)"""
+        channel = self.ui_channel
+        if event == 'added':
+            channel.post_call(self.video_list.add_video, video_item)
+        elif event == 'updated':
+            channel.post_update(video_item.id, changes,
+                                lambda video_id, merged: self.video_list.update_video(video_id, **merged))
+        elif event == 'removed':
+            channel.post_call(self.video_list.remove_video, video_item.id)
+        elif event == 'cleared':
+            channel.post_call(self.video_list.remove_all)
+        elif event == 'slots':
+            channel.post_update('slots', changes, lambda key, merged: self.video_list.update_slots(merged))
+        elif event == 'analysis':
+            channel.post_update('analysis', changes, lambda key, merged: self.video_list.update_analysis(merged))
+        elif event in ('added_many', 'restored'):
+            channel.post_call(self.video_list.add_videos, changes['video_items'])
+        elif event == 'expansion':
+            if changes['done']:
+                channel.post_call(self.show_expansion, changes)
+            else:
+                channel.post_update('expansion', changes, lambda key, merged: self.show_expansion(merged))
+        elif event == 'batch_completed':
+            channel.post_call(self.show_batch_summary, changes)
+        elif event == 'unexpected_error':
+            channel.post_call(messagebox.showerror,
+                              "Unexpected Error",
+                              f"Video: {video_item.title}\n\n{changes['error']}\n\nCheck error log for details.")
+        
     def on_url_change(self, *args):
         """Handle URL input changes"""
         url = self.url_var.get().strip()
@@ -1571,19 +1760,14 @@ Powered by yt-dlp"""
         else:
             self.url_status_var.set("❌ URL not supported")
             
+    def on_closing(self):
+        """Save the queue before closing"""
+        self.engine.close()
+        self.root.destroy()
+        
     def validate_url(self, url):
         """Validate if URL is supported"""
-        supported_domains = [
-            'youtube.com', 'youtu.be', 'facebook.com', 'fb.watch',
-            'tiktok.com', 'instagram.com', 'twitter.com', 'x.com'
-        ]
-        
-        try:
-            parsed = urlparse(url)
-            domain = parsed.netloc.lower()
-            return any(supported in domain for supported in supported_domains)
-        except:
-            return False
+        return self.engine.validate_url(url)
             
     def add_url_to_queue(self):
         """Add single URL or playlist to queue"""
@@ -1594,33 +1778,90 @@ Powered by yt-dlp"""
         if not self.validate_url(url):
             messagebox.showerror("Error", "URL not supported! 🚫")
             return
-        # Detect playlist URLs and add all entries
-        try:
-            import yt_dlp
-            # Use flat extraction to get playlist entries
-            if 'playlist' in url or 'list=' in url:
-                opts = {'quiet': True, 'extract_flat': 'in_playlist'}
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                entries = info.get('entries', []) or []
-                count = 0
-                for entry in entries:
-                    video_url = entry.get('url') or entry.get('webpage_url')
-                    if video_url and self.validate_url(video_url):
-                        self.add_video_to_queue(video_url)
-                        count += 1
-                messagebox.showinfo("Playlist Added", f"✅ Added {count} videos from playlist 📃")
-                self.url_var.set("")
-                return
-        except yt_dlp.DownloadError:
-            # Not a playlist, fall back to single
-            pass
-        except Exception as e:
-            messagebox.showerror("Playlist Error", f"❌ Failed to parse playlist: {e}")
+        # Playlists/channels expand in the background, entries appear page by page.
+        # Like single videos they are only queued; Start downloads them
+        if is_playlist_url(url):
+            expansion = self.engine.expand_in_background(url, self.quality_var.get(), start=False)
+            self.expansions.append(expansion)
+            self.cancel_expansion_btn.pack(side=tk.RIGHT, padx=(0, 10))
+            self.url_status_var.set("📃 Fetching playlist...")
+            self.url_var.set("")
             return
         # Single video
-        self.add_video_to_queue(url)
+        if self.add_video_to_queue(url) is None:
+            messagebox.showinfo("Already Queued", "⏭️ This video is already in the queue!")
+        self.url_var.set("")
+        
+    def subscribe_url(self):
+        """Subscribe to the channel/playlist in the URL box and sync it"""
+        url = self.url_var.get().strip()
+        if not url or not self.validate_url(url) or not is_playlist_url(url):
+            messagebox.showerror("Error", "Please enter a channel or playlist URL! 📺")
+            return
+        try:
+            self.engine.add_subscription(url, self.quality_var.get())
+        except RuntimeError as e:
+            messagebox.showerror("Subscription Error", f"❌ {e}")
+            return
         self.url_var.set("")
+        self.sync_subscriptions([url])
+        
+    def sync_subscriptions(self, urls=None):
+        """Queue what is new in the subscribed channels/playlists"""
+        expansions = self.engine.sync_subscriptions(set(urls) if urls else None, start=False)
+        if not expansions:
+            messagebox.showinfo("Subscriptions", "No subscriptions yet - use ⭐ Subscribe to URL")
+            return
+        self.syncing = expansions
+        self.expansions.extend(expansions)
+        self.cancel_expansion_btn.pack(side=tk.RIGHT, padx=(0, 10))
+        self.url_status_var.set(f"🔁 Syncing {len(expansions)} subscriptions...")
+        
+    def show_sync_summary(self):
+        """One summary once every subscription of a sync has been listed"""
+        added = sum(e.added for e in self.syncing)
+        failed = [e.url for e in self.syncing if e.error]
+        message = f"✅ {added} new videos from {len(self.syncing)} subscriptions"
+        if failed:
+            message += f"\n\n⚠️ Could not list {len(failed)}:\n" + "\n".join(failed[:10])
+        self.syncing = []
+        messagebox.showinfo("Subscriptions Synced", message)
+        
+    def cancel_expansions(self):
+        """Stop all running playlist expansions (after the current page)"""
+        for expansion in self.expansions:
+            expansion.cancel()
+        self.url_status_var.set("⏹️ Stopping playlist...")
+        
+    def show_expansion(self, stats):
+        """Live playlist expansion counter; summary when it ends"""
+        if not stats['done']:
+            if not any(e.url == stats['url'] and not e.done for e in self.expansions):
+                return  # late tick of an expansion that already ended
+            self.url_status_var.set(f"📃 Fetching playlist... {stats['found']} found, "
+                                    f"{stats['added']} added")
+            return
+        
+        self.expansions = [e for e in self.expansions if not e.done]
+        if not self.expansions:
+            self.cancel_expansion_btn.pack_forget()
+        self.url_status_var.set("Paste video URLs here...")
+        
+        if stats['sync']:
+            if self.syncing and all(e.done for e in self.syncing):
+                self.show_sync_summary()
+            return
+        if stats['error'] and not stats['found']:
+            messagebox.showerror("Playlist Error", f"❌ Failed to parse playlist: {stats['error']}")
+            return
+        message = f"✅ Added {stats['added']} videos from playlist 📃"
+        if stats['added'] < stats['found']:
+            message += f"\n\n⏭️ {stats['found'] - stats['added']} already in queue"
+        if stats['cancelled']:
+            message += "\n\n⏹️ Stopped before the end of the playlist"
+        elif stats['error']:
+            message += f"\n\n⚠️ Stopped early: {stats['error']}"
+        messagebox.showinfo("Playlist Added", message)
         
     def add_bulk_urls(self):
         """Add multiple URLs from text area"""
@@ -1630,487 +1871,45 @@ Powered by yt-dlp"""
             return
             
         urls = [url.strip() for url in text_content.split('\n') if url.strip()]
+        valid_urls = [url for url in urls if self.validate_url(url)]
         
-        valid_count = 0
-        for url in urls:
-            if self.validate_url(url):
-                self.add_video_to_queue(url)
-                valid_count += 1
+        # Duplicates (same video in any URL form) are dropped by the engine
+        added = self.engine.add_videos([{'url': url, 'quality': self.quality_var.get()}
+                                        for url in valid_urls])
                 
         self.bulk_text.delete(1.0, tk.END)
-        messagebox.showinfo("Success", f"Added {valid_count} valid URLs to queue!")
+        message = f"Added {len(added)} valid URLs to queue!"
+        if len(added) < len(valid_urls):
+            message += f"\n\n⏭️ Skipped {len(valid_urls) - len(added)} duplicates"
+        messagebox.showinfo("Success", message)
         
         # Switch to queue tab
         self.notebook.select(1)
         
     def add_video_to_queue(self, url):
-        """Add video to download queue"""
-        quality = self.quality_var.get()
-        video_item = VideoItem(url, quality)
-        
-        self.video_queue[video_item.id] = video_item
-        self.video_list.add_video(video_item)
+        """Add video to download queue (None if it is already queued)"""
+        return self.engine.add_video(url, self.quality_var.get())
         
-        # Analyze video info in background
-        thread = threading.Thread(target=self.analyze_video, args=(video_item,))
-        thread.daemon = True
-        thread.start()
-        
-    def analyze_video(self, video_item):
-        """Analyze video to get metadata"""
-        try:
-            import yt_dlp
-            
-            video_item.status = "analyzing"
-            self.video_list.update_video(video_item.id, status="analyzing")
-            
-            # Special handling for TikTok
-            ydl_opts = {
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False,
-            }
-            
-            # Platform-specific configurations
-            if 'tiktok.com' in video_item.url:
-                ydl_opts.update({
-                    'http_headers': {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                        'Accept-Language': 'en-us,en;q=0.5',
-                        'Accept-Encoding': 'gzip,deflate',
-                        'Accept-Charset': 'ISO-8859-1,utf-8;q=0.7,*;q=0.7',
-                        'Keep-Alive': '300',
-                        'Connection': 'keep-alive',
-                    },
-                    'cookiefile': None,
-                    'cookiesfrombrowser': None,
-                })
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                try:
-                    info = ydl.extract_info(video_item.url, download=False)
-                    
-                    # 🔥 Keep FULL title - no truncation!
-                    video_item.title = info.get('title', 'Unknown')
-                    video_item.duration = info.get('duration', 0)
-                    video_item.uploader = info.get('uploader', 'Unknown')
-                    video_item.thumbnail_url = info.get('thumbnail', '')
-                    video_item.status = "pending"
-                    
-                    # Update UI with full title
-                    self.video_list.update_video(video_item.id, 
-                                               title=video_item.title,
-                                               status="pending")
-                                               
-                except yt_dlp.DownloadError as e:
-                    error_msg = str(e)
-                    video_item.status = "error"
-                    
-                    # Provide specific error messages for common issues
-                    if "Private video" in error_msg:
-                        video_item.error_message = "Video is private or unavailable"
-                    elif "Video unavailable" in error_msg:
-                        video_item.error_message = "Video not found or region blocked"
-                    elif "Sign in to confirm your age" in error_msg:
-                        video_item.error_message = "Age-restricted video"
-                    elif "This video is not available" in error_msg:
-                        video_item.error_message = "Video removed or restricted"
-                    elif "tiktok" in video_item.url.lower() and "403" in error_msg:
-                        video_item.error_message = "TikTok access blocked - try different URL format"
-                    else:
-                        video_item.error_message = f"Analysis failed: {error_msg[:100]}"
-                    
-                    self.video_list.update_video(video_item.id, status="error")
-                    
-        except ImportError:
-            video_item.status = "error"
-            video_item.error_message = "yt-dlp not installed"
-            self.video_list.update_video(video_item.id, status="error")
-        except Exception as e:
-            video_item.status = "error"
-            video_item.error_message = f"Unexpected error: {str(e)[:100]}"
-            self.video_list.update_video(video_item.id, status="error")
-            
     def start_batch_download(self):
         """Start downloading all pending videos"""
-        pending_videos = [v for v in self.video_queue.values() if v.status == "pending"]
-        
-        if not pending_videos:
+        if not self.engine.start_batch():
             messagebox.showinfo("Info", "No videos to download!")
-            return
-            
-        # Reset batch summary
-        self.batch_summary = {
-            'total': len(pending_videos),
-            'completed': 0,
-            'failed': 0,
-            'errors': [],
-            'start_time': datetime.now()
-        }
-            
-        # Start initial downloads up to concurrency limit
-        self.check_and_start_more()
-            
-        # Start monitoring thread for batch completion
-        monitor_thread = threading.Thread(target=self.monitor_batch_completion)
-        monitor_thread.daemon = True
-        monitor_thread.start()
-            
-    def start_video_download(self, video_id):
-        """Start downloading a specific video"""
-        if video_id not in self.video_queue:
-            return
-            
-        video_item = self.video_queue[video_id]
-        
-        if video_item.status in ["downloading", "completed"]:
-            return
-            
-        # Create download thread
-        thread = threading.Thread(target=self.download_video_worker, args=(video_item,))
-        thread.daemon = True
-        self.download_threads[video_id] = thread
-        thread.start()
-        
-    def download_video_worker(self, video_item):
-        """Worker function for downloading video"""
-        try:
-            import yt_dlp
-            
-            video_item.status = "downloading"
-            self.video_list.update_video(video_item.id, status="downloading")
-            
-            def progress_hook(d):
-                if d['status'] == 'downloading':
-                    # Guard against None values (some extractors return None for total_bytes)
-                    total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
-                    downloaded = d.get('downloaded_bytes') or 0
-                    speed = d.get('speed', 0) or 0
-                    eta = d.get('eta', 0) or 0
-
-                    # Determine progress mode and calculate progress
-                    if isinstance(total, (int, float)) and total > 0 and isinstance(downloaded, (int, float)):
-                        # Determinate mode - we know total size
-                        progress = (downloaded / total) * 100
-                        progress = max(0.0, min(100.0, progress))  # Clamp progress
-                        video_item.progress = progress
-                        video_item.progress_mode = "determinate"
-                        
-                        # Update UI with determinate progress
-                        self.video_list.update_video(video_item.id,
-                                                   progress=progress,
-                                                   progress_mode="determinate",
-                                                   speed=speed,
-                                                   eta=eta)
-                    else:
-                        # Indeterminate mode - unknown total size
-                        video_item.progress_mode = "indeterminate"
-                        
-                        # Update UI with indeterminate progress and speed info
-                        self.video_list.update_video(video_item.id,
-                                                   progress_mode="indeterminate",
-                                                   speed=speed,
-                                                   eta=eta)
-
-                    video_item.speed = speed
-                    video_item.eta = eta
-                        
-                elif d['status'] == 'finished':
-                    video_item.status = "completed"
-                    video_item.progress = 100
-                    video_item.filename = os.path.basename(d['filename'])
-                    # Update UI
-                    self.video_list.update_video(video_item.id,
-                                               status="completed",
-                                               progress=100)
-                    # Update batch summary
-                    self.batch_summary['completed'] += 1
-                    # Start next pending downloads
-                    try:
-                        self.check_and_start_more()
-                    except Exception:
-                        pass
-                    
-            # Get filename template from settings
-            filename_template = self.filename_template_var.get() if hasattr(self, 'filename_template_var') else '%(title)s.%(ext)s'
-            
-            # Enhanced yt-dlp options
-            ydl_opts = {
-                'outtmpl': os.path.join(self.download_path, filename_template),
-                'progress_hooks': [progress_hook],
-                'format': self.get_format_selector(video_item.quality),
-                # Auto-fix MPEG-TS in MP4 container or AAC timestamps
-                'fixup': 'detect_or_warn',  
-                'noplaylist': True,
-                'extract_flat': False,
-                'writeinfojson': False,
-                'writethumbnail': False,
-                'ignoreerrors': False,
-                'retries': 3,
-                'fragment_retries': 3,
-                'timeout': 30,
-                # FFmpeg options
-                'prefer_ffmpeg': True,
-                'ffmpeg_location': None,  # Let yt-dlp find it
-                # 🔥 Filename options - Keep full title, only replace truly invalid chars
-                'restrictfilenames': False,  # Keep Unicode and special chars like : # ?
-                'windowsfilenames': False,   # Don't auto-sanitize, we'll do custom replacement
-            }
-            
-            # Audio extraction if enabled
-            audio_only = self.audio_only_var.get() if hasattr(self, 'audio_only_var') else False
-            if audio_only or video_item.extract_audio:
-                ydl_opts.update({
-                    'format': 'bestaudio/best',
-                    'postprocessors': [{
-                        'key': 'FFmpegExtractAudio',
-                        'preferredcodec': 'mp3',
-                        'preferredquality': '192',
-                    }],
-                })
-            
-            # Platform-specific configurations
-            if 'tiktok.com' in video_item.url:
-                ydl_opts.update({
-                    'format': 'best[ext=mp4]/best',
-                    'http_headers': {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                        'Referer': 'https://www.tiktok.com/',
-                    },
-                    'cookiefile': None,
-                })
-            elif 'instagram.com' in video_item.url:
-                ydl_opts.update({
-                    'format': 'best[ext=mp4]/best',
-                })
-            elif 'facebook.com' in video_item.url or 'fb.watch' in video_item.url:
-                ydl_opts.update({
-                    'format': 'best[ext=mp4]/best',
-                })
-            
-            # Use aria2c for segmented downloading if available
-            try:
-                import shutil
-                if shutil.which('aria2c'):
-                    ydl_opts['external_downloader'] = 'aria2c'
-                    ydl_opts['external_downloader_args'] = ['-x', '16', '-k', '1M']
-            except Exception:
-                pass
-            
-            # 🔥 Custom postprocessor hook to handle Windows filename restrictions
-            class CustomFilenameHook:
-                """Hook to sanitize ONLY truly invalid Windows chars while keeping full title"""
-                
-                @staticmethod
-                def sanitize_windows_filename(filename):
-                    """Replace ONLY chars that Windows doesn't allow in filenames"""
-                    import re
-                    
-                    # Windows forbidden chars and their safe replacements
-                    replacements = {
-                        '<': '＜',   # Fullwidth less-than
-                        '>': '＞',   # Fullwidth greater-than
-                        ':': '：',   # Fullwidth colon (keep : spirit)
-                        '"': '＂',   # Fullwidth quotation mark
-                        '/': '／',   # Fullwidth solidus
-                        '\\': '＼',  # Fullwidth reverse solidus
-                        '|': '｜',   # Fullwidth vertical line
-                        '?': '？',   # Fullwidth question mark (keep ? spirit)
-                        '*': '＊',   # Fullwidth asterisk
-                    }
-                    
-                    # Replace forbidden chars with visually similar safe chars
-                    for forbidden, safe in replacements.items():
-                        filename = filename.replace(forbidden, safe)
-                    
-                    # Remove leading/trailing spaces and dots (Windows restriction)
-                    filename = filename.strip(' .')
-                    
-                    # Keep everything else including: # @ $ % ^ & ( ) - _ + = [ ] { } ; ' , . ~ `
-                    return filename
-                
-                def __call__(self, info):
-                    """Called after file is downloaded"""
-                    try:
-                        if 'filepath' in info and os.path.exists(info['filepath']):
-                            original_path = info['filepath']
-                            directory = os.path.dirname(original_path)
-                            filename = os.path.basename(original_path)
-                            
-                            # Sanitize filename
-                            safe_filename = self.sanitize_windows_filename(filename)
-                            
-                            if safe_filename != filename:
-                                new_path = os.path.join(directory, safe_filename)
-                                
-                                # Rename file
-                                try:
-                                    if os.path.exists(new_path):
-                                        # If target exists, add timestamp
-                                        name, ext = os.path.splitext(safe_filename)
-                                        timestamp = datetime.now().strftime('%H%M%S')
-                                        safe_filename = f"{name}_{timestamp}{ext}"
-                                        new_path = os.path.join(directory, safe_filename)
-                                    
-                                    os.rename(original_path, new_path)
-                                    info['filepath'] = new_path
-                                    print(f"\n✅ Filename sanitized (Windows-safe):")
-                                    print(f"   {filename}")
-                                    print(f"   → {safe_filename}\n")
-                                except Exception as e:
-                                    print(f"⚠️ Could not rename file: {e}")
-                    except Exception as e:
-                        print(f"⚠️ Filename hook error: {e}")
-                    
-                    return [], info  # Return empty postprocessor list and modified info
             
-            # Add custom filename hook
-            ydl_opts['postprocessor_hooks'] = [CustomFilenameHook()]
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_item.url])
-                
-        except yt_dlp.DownloadError as e:
-            error_msg = str(e)
-            detailed_traceback = traceback.format_exc()
-            
-            # Check if this is a retryable error
-            retryable_errors = ["timeout", "network", "connection", "429", "503", "timed out"]
-            is_retryable = any(err in error_msg.lower() for err in retryable_errors)
-            
-            if is_retryable and video_item.retry_count < video_item.max_retries:
-                # Retry with exponential backoff
-                video_item.retry_count += 1
-                retry_delay = 3 * (2 ** (video_item.retry_count - 1))  # 3s, 6s, 12s
-                
-                video_item.error_message = f"Retrying... (attempt {video_item.retry_count}/{video_item.max_retries})"
-                self.video_list.update_video(video_item.id, status="pending")
-                
-                # Schedule retry
-                def retry_download():
-                    time.sleep(retry_delay)
-                    self.start_video_download(video_item.id)
-                
-                retry_thread = threading.Thread(target=retry_download)
-                retry_thread.daemon = True
-                retry_thread.start()
-                return
-            
-            # Max retries exceeded or non-retryable error
-            video_item.status = "error"
-            
-            # Categorize errors for better user understanding
-            if "ffmpeg" in error_msg.lower() or "postprocessor" in error_msg.lower():
-                video_item.error_message = "FFmpeg required - Please install FFmpeg or try different quality"
-            elif "HTTP Error 403" in error_msg:
-                video_item.error_message = "Access denied - Video may be private or region-blocked"
-            elif "HTTP Error 404" in error_msg:
-                video_item.error_message = "Video not found - May have been deleted"
-            elif "HTTP Error 429" in error_msg:
-                video_item.error_message = "Rate limited - Too many requests, try again later"
-            elif "Sign in to confirm your age" in error_msg:
-                video_item.error_message = "Age-restricted content - Cannot download"
-            elif "Private video" in error_msg:
-                video_item.error_message = "Private video - Access denied"
-            elif "Video unavailable" in error_msg:
-                video_item.error_message = "Video unavailable - May be deleted or restricted"
-            elif "tiktok" in video_item.url.lower():
-                video_item.error_message = "TikTok download failed - Platform restrictions"
-            else:
-                video_item.error_message = f"Download failed: {error_msg[:100]}"
-            
-            # Add retry info if retries were attempted
-            if video_item.retry_count > 0:
-                video_item.error_message += f" (after {video_item.retry_count} retries)"
-            
-            # Log detailed error
-            self.error_logger.log_download_error(video_item, error_msg, detailed_traceback)
-            
-            self.video_list.update_video(video_item.id, status="error")
-            
-            # Update batch summary
-            self.batch_summary['failed'] += 1
-            self.batch_summary['errors'].append({
-                'title': video_item.title,
-                'url': video_item.url[:50] + "...",
-                'error': video_item.error_message
-            })
-            
-        except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            video_item.status = "error"
-            video_item.error_message = error_msg[:100]
-            detailed_traceback = traceback.format_exc()
-            
-            # Log detailed error
-            try:
-                self.error_logger.log_download_error(video_item, error_msg, detailed_traceback)
-            except Exception:
-                pass
-            
-            # Show detailed error to user (fixed: self.root not self.app.root)
-            try:
-                self.root.after(0, lambda: messagebox.showerror(
-                    "Unexpected Error",
-                    f"Video: {video_item.title}\n\n{error_msg}\n\nCheck error log for details."
-                ))
-            except Exception:
-                pass
-            
-            # Update UI
-            try:
-                self.video_list.update_video(video_item.id, status="error")
-            except Exception:
-                pass
-            
-            # Update batch summary
-            self.batch_summary['failed'] += 1
-            self.batch_summary['errors'].append({
-                'title': video_item.title,
-                'url': video_item.url[:50] + "...",
-                'error': video_item.error_message
-            })
-        finally:
-            # After finishing one download, start more if pending
-            try:
-                self.check_and_start_more()
-            except Exception:
-                pass
     
-    def get_format_selector(self, quality):
-        """Get format selector for yt-dlp with FFmpeg fallbacks"""
-        # Try formats that don't require FFmpeg first, then fallback
-        quality_map = {
-            "best": "best[ext=mp4]/best[ext=webm]/best[ext=flv]/best",
-            "1080p": "best[height<=1080][ext=mp4]/best[height<=1080][ext=webm]/best[height<=1080]",
-            "720p": "best[height<=720][ext=mp4]/best[height<=720][ext=webm]/best[height<=720]",
-            "480p": "best[height<=480][ext=mp4]/best[height<=480][ext=webm]/best[height<=480]",
-            "360p": "best[height<=360][ext=mp4]/best[height<=360][ext=webm]/best[height<=360]",
-            "worst": "worst[ext=mp4]/worst[ext=webm]/worst"
-        }
-        return quality_map.get(quality, "best[ext=mp4]/best[ext=webm]/best")
-        
     def toggle_video_download(self, video_id):
-        """Toggle pause/resume for video"""
-        # This would require more advanced implementation with yt-dlp
-        pass        
-    def cancel_video_download(self, video_id):
-        """Cancel video download"""
-        if video_id in self.video_queue:
-            video_item = self.video_queue[video_id]
-            video_item.status = "cancelled"
-            self.video_list.update_video(video_id, status="cancelled")
-            
+        """Toggle pause/resume for video (resume continues from the .part file)"""
+        video = self.engine.video_queue.get(video_id)
+        if not video:
+            return
+        if video.status == "paused":
+            self.engine.resume_video_download(video_id)
+        else:
+            self.engine.pause_video_download(video_id)
+        
     def retry_video_download(self, video_id):
         """Retry failed video download"""
-        if video_id in self.video_queue:
-            video_item = self.video_queue[video_id]
-            video_item.status = "pending"
-            video_item.progress = 0
-            self.video_list.update_video(video_id, status="pending", progress=0)
-            self.start_video_download(video_id)
-            
+        self.engine.retry_video_download(video_id)
+        
     def browse_folder(self):
         """Browse for download folder"""
         folder = filedialog.askdirectory(initialdir=self.download_path)
@@ -2118,6 +1917,7 @@ Powered by yt-dlp"""
         if folder:
             self.download_path = folder
             self.folder_var.set(folder)
+            self.engine.configure(download_path=folder)
             
     def toggle_theme(self):
         """Toggle between light and dark theme"""
@@ -2161,23 +1961,9 @@ Powered by yt-dlp"""
         
     def refresh_video_widgets(self):
         """Refresh all video widgets with new theme"""
-        if hasattr(self, 'video_list') and hasattr(self.video_list, 'video_widgets'):
-            for video_id, widget_data in self.video_list.video_widgets.items():
-                # Update container background
-                try:
-                    container = widget_data['container']
-                    # Force recreation of video widget with new theme
-                    video_item = widget_data['video_item']
-                    
-                    # Remove old widget
-                    container.destroy()
-                    
-                    # Create new widget with current theme
-                    new_widget = self.video_list.create_video_widget(video_item)
-                    self.video_list.video_widgets[video_id] = new_widget
-                    
-                except Exception as e:
-                    print(f"Error refreshing widget {video_id}: {e}")
+        if hasattr(self, 'video_list'):
+            # Rows are recycled, so rebuilding the pool re-themes every video
+            self.video_list.rebuild_rows()
             
     def show_about(self):
         """Show about dialog"""
@@ -2185,45 +1971,27 @@ Powered by yt-dlp"""
 
         messagebox.showinfo("About CZ Video Downloader", about_text)
         
-    def monitor_batch_completion(self):
-        """Monitor batch download completion and show summary"""
-        while True:
-            time.sleep(2)  # Check every 2 seconds
-            
-            # Check if all downloads are completed
-            active_statuses = ['analyzing', 'downloading', 'pending']
-            active_videos = [v for v in self.video_queue.values() 
-                           if v.status in active_statuses]
-            
-            if not active_videos and self.batch_summary['total'] > 0:
-                # All downloads completed, show summary
-                self.root.after(0, self.show_batch_summary)
-                break
-                
-    def show_batch_summary(self):
+    def show_batch_summary(self, batch_summary):
         """Show batch download completion summary"""
-        if self.batch_summary['total'] == 0:
+        if batch_summary['total'] == 0:
             return
             
         # Calculate statistics
-        total = self.batch_summary['total']
-        completed = self.batch_summary['completed']
-        failed = self.batch_summary['failed']
+        total = batch_summary['total']
+        completed = batch_summary['completed']
+        failed = batch_summary['failed']
         success_rate = (completed / total * 100) if total > 0 else 0
         
         # Calculate duration
-        if 'start_time' in self.batch_summary:
-            duration = datetime.now() - self.batch_summary['start_time']
+        if 'start_time' in batch_summary:
+            duration = datetime.now() - batch_summary['start_time']
             duration_str = str(duration).split('.')[0]  # Remove microseconds
         else:
             duration_str = "Unknown"
         
-        # Log batch summary to file
-        self.error_logger.log_batch_summary(self.batch_summary)
-        
         # Create summary window with enhanced styling
         summary_window = tk.Toplevel(self.root)
-        summary_window.title("Batch Download Summary")
+        summary_window.title(f"Batch #{batch_summary.get('batch_id', '')} Download Summary")
         summary_window.geometry("600x500")
         summary_window.resizable(True, True)
         summary_window.grab_set()
@@ -2272,7 +2040,7 @@ Powered by yt-dlp"""
         ttk.Label(stats_grid, text=duration_str, font=("Segoe UI", 10)).grid(row=2, column=1, sticky=tk.W, columnspan=3, pady=(5, 0))
         
         # Errors section (if any)
-        if failed > 0 and self.batch_summary['errors']:
+        if failed > 0 and batch_summary['errors']:
             errors_frame = ttk.LabelFrame(main_frame, text="❌ Error Details", padding="15")
             errors_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
             
@@ -2288,7 +2056,7 @@ Powered by yt-dlp"""
             error_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
             
             # Populate errors
-            for i, error in enumerate(self.batch_summary['errors'], 1):
+            for i, error in enumerate(batch_summary['errors'], 1):
                 error_text.insert(tk.END, f"{i}. {error['title']}\n")
                 error_text.insert(tk.END, f"   URL: {error['url']}\n")
                 error_text.insert(tk.END, f"   Error: {error['error']}\n\n")
@@ -2327,124 +2095,83 @@ Powered by yt-dlp"""
                              command=summary_window.destroy)
         close_btn.pack(side=tk.RIGHT)
         
-        # Reset batch summary
-        self.batch_summary = {'total': 0, 'completed': 0, 'failed': 0, 'errors': []}
-        
     def retry_failed_downloads(self):
         """Retry all failed downloads"""
-        failed_videos = [v for v in self.video_queue.values() if v.status == "error"]
-        
-        if not failed_videos:
+        if not self.engine.retry_failed_downloads():
             messagebox.showinfo("Info", "No failed downloads to retry!")
             return
             
-        for video in failed_videos:
-            video.status = "pending"
-            video.progress = 0
-            video.error_message = ""
-            self.video_list.update_video(video.id, status="pending", progress=0)
-            
-        # Switch to queue tab and start downloads
+        # Switch to queue tab
         self.notebook.select(1)
-        self.start_batch_download()
-    
-    def check_and_start_more(self):
-        """Start next pending downloads up to concurrency limit"""
-        max_concurrent = int(self.concurrent_var.get())
-        # count current downloading threads
-        current = [v for v in self.video_queue.values() if v.status == "downloading"]
-        pending = [v for v in self.video_queue.values() if v.status == "pending"]
-        for video in pending:
-            if len(current) < max_concurrent:
-                self.start_video_download(video.id)
-                current.append(video)
-            else:
-                break
     
     def export_queue(self):
-        """Export current queue to JSON file"""
-        try:
-            if not self.video_queue:
-                messagebox.showinfo("Export Queue", "Queue is empty!")
-                return
-            
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
-                initialfile=f"czDownloader_queue_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            )
+        """Export current queue to an NDJSON file or plain URL list"""
+        if not self.engine.video_queue:
+            messagebox.showinfo("Export Queue", "Queue is empty!")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".ndjson",
+            filetypes=[("NDJSON queue", "*.ndjson"), ("URL list", "*.txt"), ("All files", "*.*")],
+            initialfile=f"czDownloader_queue_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
+        )
+        
+        if file_path:
+            # Write in the background so large queues don't freeze the window
+            def worker():
+                try:
+                    count = self.engine.export_queue(file_path)
+                    self.ui_channel.post_call(messagebox.showinfo, "Export Successful",
+                                              f"✅ Exported {count} videos to:\n{file_path}")
+                except Exception as e:
+                    self.ui_channel.post_call(messagebox.showerror, "Export Failed",
+                                              f"❌ Failed to export queue:\n{str(e)}")
             
-            if file_path:
-                queue_data = {
-                    'exported_at': datetime.now().isoformat(),
-                    'total_videos': len(self.video_queue),
-                    'videos': [v.to_dict() for v in self.video_queue.values()]
-                }
-                
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(queue_data, f, indent=2, ensure_ascii=False)
-                
-                messagebox.showinfo("Export Successful", 
-                                  f"✅ Exported {len(self.video_queue)} videos to:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("Export Failed", f"❌ Failed to export queue:\n{str(e)}")
+            threading.Thread(target=worker, daemon=True).start()
     
     def import_queue(self):
-        """Import queue from JSON file"""
-        try:
-            file_path = filedialog.askopenfilename(
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
-            )
+        """Import queue from an NDJSON file, URL list or old JSON export"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Queue files", "*.ndjson *.jsonl *.json *.txt"), ("All files", "*.*")]
+        )
+        
+        if file_path:
+            # Switch to queue tab
+            self.notebook.select(1)
             
-            if file_path:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    queue_data = json.load(f)
-                
-                imported_count = 0
-                for video_data in queue_data.get('videos', []):
-                    # Create new video item
-                    video = VideoItem(video_data['url'], video_data.get('quality', 'best'))
-                    video.title = video_data.get('title', 'Loading...')
-                    video.status = "pending"  # Reset to pending
-                    video.progress = 0
-                    
-                    # Add to queue
-                    self.video_queue[video.id] = video
-                    self.video_list.add_video(video)
-                    imported_count += 1
-                
-                # Switch to queue tab
-                self.notebook.select(1)
-                
-                messagebox.showinfo("Import Successful", 
-                                  f"✅ Imported {imported_count} videos from:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("Import Failed", f"❌ Failed to import queue:\n{str(e)}")
+            # Stream chunks into the queue from a worker thread; rows appear as they arrive
+            def show_progress(key, changes):
+                if changes.get('done'):
+                    self.url_status_var.set("Paste video URLs here...")
+                else:
+                    self.url_status_var.set(f"📂 Importing... {changes['imported']} videos")
+            
+            def on_progress(imported, done=False):
+                self.ui_channel.post_update('import', {'imported': imported, 'done': done}, show_progress)
+            
+            def worker():
+                try:
+                    imported, skipped = self.engine.import_queue(file_path, on_progress)
+                    on_progress(imported, done=True)
+                    message = f"✅ Imported {imported} videos from:\n{file_path}"
+                    if skipped:
+                        message += f"\n\n⚠️ Skipped {skipped} unsupported or duplicate URLs"
+                    self.ui_channel.post_call(messagebox.showinfo, "Import Successful", message)
+                except Exception as e:
+                    self.ui_channel.post_call(messagebox.showerror, "Import Failed",
+                                              f"❌ Failed to import queue:\n{str(e)}")
+            
+            threading.Thread(target=worker, daemon=True).start()
     
     def cancel_video_download(self, video_id):
         """Cancel a download in progress"""
         try:
-            if video_id in self.video_queue:
-                video = self.video_queue[video_id]
-                video.cancel_flag = True
-                video.status = "cancelled"
-                self.video_list.update_video(video_id, status="cancelled")
-                
-                # Try to stop the thread (yt-dlp doesn't have clean cancellation)
-                if video_id in self.download_threads:
-                    # The thread will check cancel_flag in next hook call
-                    pass
-                
+            video = self.engine.cancel_video_download(video_id)
+            if video:
                 messagebox.showinfo("Cancelled", f"Download cancelled: {video.title}")
         except Exception as e:
             messagebox.showerror("Cancel Failed", f"Failed to cancel:\n{str(e)}")
     
-    def toggle_video_download(self, video_id):
-        """Pause/resume video download (not fully supported by yt-dlp)"""
-        messagebox.showinfo("Feature Info", 
-                          "⚠️ Pause/Resume is not supported by yt-dlp.\n"
-                          "You can cancel and retry the download.")
-    
     def setup_drag_drop(self, widget):
         """Setup drag-and-drop functionality for URL input"""
         def on_drop(event):
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bandwidth accounting for resumed downloads
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.bandwidth import BandwidthLimiter, ReceivedCounter
+
+MB = 1024 * 1024
+
+
+class ReceivedCounterTest(unittest.TestCase):
+
+    def test_resumed_bytes_are_not_counted(self):
+        counter = ReceivedCounter()
+        self.assertEqual(counter.delta(50 * MB), 0)  # already on disk
+        self.assertEqual(counter.delta(50 * MB + 5000), 5000)
+
+    def test_reset_starts_a_new_baseline(self):
+        counter = ReceivedCounter()
+        counter.delta(0)
+        counter.delta(10 * MB)
+        counter.reset()
+        self.assertEqual(counter.delta(3 * MB), 0)  # second file, resumed
+        self.assertEqual(counter.delta(4 * MB), MB)
+
+    def test_resume_does_not_drain_shared_bucket(self):
+        limiter = BandwidthLimiter(rate=5 * MB)
+        counter = ReceivedCounter()
+        delay = limiter.consume(counter.delta(50 * MB), wait=False)
+        delay += limiter.consume(counter.delta(50 * MB + 5000), wait=False)
+        self.assertLess(delay, 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()